@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import random
+import neat
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from config.config_variables import *
+from src.simulation import Simulation
+from src.car import Car
+
+WARM_TICKS = 8
+
+
+def loadConfig():
+    return neat.config.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        os.path.join(ROOT, "config", "config_file.txt"),
+    )
+
+
+def createGenomes(config, size, seed):
+    # fresh genomes without building a Population, which would speciate them
+    random.seed(seed)
+    reporters = neat.reporting.ReporterSet()
+    stagnation = config.stagnation_type(config.stagnation_config, reporters)
+    reproduction = config.reproduction_type(
+        config.reproduction_config, reporters, stagnation
+    )
+    population = reproduction.create_new(config.genome_type, config.genome_config, size)
+    return list(population.items())
+
+
+def timeCall(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def warmSimulation(genomes, config, seed, ticks=WARM_TICKS):
+    simulation = Simulation(rng=random.Random(seed))
+    simulation.reset(genomes, config)
+    for _ in range(ticks):
+        bestPos = simulation.step()
+        if simulation.pop.count() == 0:
+            break
+        simulation.advance(bestPos)
+    return simulation
+
+
+def carsFromState(pop, idx):
+    cars = []
+    for i in idx:
+        car = Car(pop.x[i], pop.y[i], 0)
+        car.rot = pop.rot[i]
+        car.vel = pop.vel[i]
+        cars.append(car)
+    return cars
@@ -0,0 +1,181 @@
+import copy
+import random
+import numpy as np
+import neat
+from .common import *
+from src.world import World
+from src.road import Road
+from src.sensors import castRays
+from src.collision import HITBOX_RADIUS, detectCollisions
+from src.simulation import budgetExhausted
+from src.parallel import ShardedEvaluator
+from src import kernels
+
+TOLERANCE = 1e-9
+
+
+def check(diff, tolerance=TOLERANCE):
+    return {"max_abs_diff": float(diff), "ok": bool(diff <= tolerance)}
+
+
+def checkSensors(simulation):
+    (world, road, pop) = (simulation.world, simulation.road, simulation.pop)
+    idx = pop.aliveIndices()
+    (x, y) = (pop.x[idx], pop.y[idx])
+    ids = road.segmentsInRange(y.min() - SENSOR_DISTANCE, y.max() + SENSOR_DISTANCE)
+    optimized = castRays(road.getSegments(ids), road.getLines(ids), x, y, pop.rot[idx])
+    reference = [car.getInputs(world, road) for car in carsFromState(pop, idx)]
+    return check(np.abs(optimized - np.array(reference)).max())
+
+
+def checkCollision(simulation):
+    (road, pop) = (simulation.road, simulation.pop)
+    idx = pop.aliveIndices()
+    (x, y) = (pop.x[idx], pop.y[idx])
+    ids = road.segmentsInRange(y.min() - HITBOX_RADIUS, y.max() + HITBOX_RADIUS)
+    optimized = detectCollisions(road.getSegments(ids), x, y, pop.rot[idx])
+    reference = [car.detectCollision(road) for car in carsFromState(pop, idx)]
+    return check(np.count_nonzero(optimized != np.array(reference)), 0)
+
+
+def checkActivation(simulation):
+    (pop, nets) = (simulation.pop, simulation.nets)
+    idx = pop.aliveIndices()
+    optimized = nets.activate(pop.inputs[idx], idx)
+    reference = [
+        neat.nn.FeedForwardNetwork.create(
+            simulation.genomes[i], simulation.config
+        ).activate(pop.inputs[i].tolist())
+        for i in idx
+    ]
+    return check(np.abs(optimized - np.array(reference)).max())
+
+
+def kernelOutputs(simulation, commands):
+    (road, pop) = (simulation.road, simulation.pop)
+    idx = pop.aliveIndices()
+    (x, y, rot) = (pop.x[idx], pop.y[idx], pop.rot[idx])
+    ids = road.segmentsInRange(y.min() - SENSOR_DISTANCE, y.max() + SENSOR_DISTANCE)
+    sensors = castRays(road.getSegments(ids), road.getLines(ids), x, y, rot)
+    ids = road.segmentsInRange(y.min() - HITBOX_RADIUS, y.max() + HITBOX_RADIUS)
+    collided = detectCollisions(road.getSegments(ids), x, y, rot)
+
+    moved = copy.deepcopy(pop)
+    moved.commands[:] = commands
+    moved.move(idx, simulation.t * simulation.dt, simulation.dt)
+    state = np.stack([moved.x, moved.y, moved.rot, moved.vel, moved.acc])
+    return (sensors, collided, state)
+
+
+def checkKernels(simulation, seed):
+    # the compiled kernels against the NumPy ones on the same cars and road
+    if not kernels.numbaAvailable():
+        return {"available": False, "ok": True}
+
+    commands = np.random.default_rng(seed).random(simulation.pop.commands.shape)
+    previous = kernels.requested or KERNEL_BACKEND
+    try:
+        kernels.setBackend("numpy")
+        (sensors, collided, state) = kernelOutputs(simulation, commands)
+        kernels.setBackend("numba")
+        (jitSensors, jitCollided, jitState) = kernelOutputs(simulation, commands)
+    finally:
+        kernels.setBackend(previous)
+
+    diff = max(np.abs(sensors - jitSensors).max(), np.abs(state - jitState).max())
+    result = check(diff)
+    result["collision_mismatches"] = int(np.count_nonzero(collided != jitCollided))
+    result["ok"] = result["ok"] and result["collision_mismatches"] == 0
+    result["available"] = True
+    return result
+
+
+def referenceFitness(genomes, config, seed):
+    # one Car and one neat network per genome, stepped with the same rules as
+    # Simulation.step; the road is the only shared state within a tick
+    world = World(STARTING_POS, WIN_WIDTH, WIN_HEIGHT)
+    road = Road(world, random.Random(seed))
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for (_, g) in genomes]
+    cars = [Car(0, 0, 0) for _ in genomes]
+    fitness = [0.0] * len(genomes)
+    alive = list(range(len(genomes)))
+    progress = [(0.0, 0)] * len(genomes)
+    t = 0
+
+    while True:
+        t += 1
+        bestY = world.getBestCarPos()[1]
+        bestPos = None
+        survivors = []
+        for i in alive:
+            car = cars[i]
+            inputs = car.getInputs(world, road) + [car.vel / MAX_VEL]
+            car.commands = nets[i].activate(inputs)
+            y_old = car.y
+            car.move(road, t)
+
+            if bestPos is None or car.y < bestPos[1]:
+                bestPos = (car.x, car.y)
+
+            dead = False
+            if t > 10:
+                (progressY, progressTick) = progress[i]
+                progressed = car.y < progressY - STAGNATION_DISTANCE
+                if progressed:
+                    progress[i] = (car.y, t)
+                dead = (
+                    car.detectCollision(road)
+                    or car.y > bestY + BAD_GENOME_TRESHOLD
+                    or car.y > y_old
+                    or car.vel < 0.1
+                    or (not progressed and t - progressTick > STAGNATION_TICKS)
+                )
+            if dead:
+                fitness[i] -= 1
+            else:
+                fitness[i] += -(car.y - y_old) / 100 + car.vel * SCORE_VEL_MULTIPLIER
+                survivors.append(i)
+
+        alive = survivors
+        if not alive or budgetExhausted(t, float("inf"), max(fitness), config):
+            break
+
+        world.updateBestCarPos(bestPos if bestPos[1] < 0 else (0, 0))
+        road.update(world)
+
+    return fitness
+
+
+def checkFitness(config, size, seed):
+    genomes = createGenomes(config, size, seed)
+    reference = referenceFitness(genomes, config, seed)
+    Simulation(rng=random.Random(seed)).evalGenomes(genomes, config)
+    optimized = [g.fitness for (_, g) in genomes]
+    return check(np.abs(np.array(optimized) - np.array(reference)).max())
+
+
+def checkSharded(config, size, seed, workers):
+    genomes = createGenomes(config, size, seed)
+    road_seed = random.Random(seed).getrandbits(32)
+    Simulation(rng=random.Random(road_seed)).evalGenomes(genomes, config)
+    single = [g.fitness for (_, g) in genomes]
+
+    evaluator = ShardedEvaluator(workers, rng=random.Random(seed))
+    evaluator.evaluate(genomes, config)
+    evaluator.stop()
+    sharded = [g.fitness for (_, g) in genomes]
+    return check(np.abs(np.array(single) - np.array(sharded)).max(), 0)
+
+
+def runEquivalence(config, size, seed, workers=0):
+    simulation = warmSimulation(createGenomes(config, size, seed), config, seed)
+    results = {
+        "sensors": checkSensors(simulation),
+        "collision": checkCollision(simulation),
+        "activation": checkActivation(simulation),
+        "fitness": checkFitness(config, size, seed),
+        "kernels": checkKernels(simulation, seed),
+    }
+    if workers > 1:
+        results["sharded"] = checkSharded(config, size, seed, workers)
+    return results
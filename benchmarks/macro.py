@@ -0,0 +1,33 @@
+import time
+import random
+from .common import *
+from src.profiler import PhaseProfiler
+
+
+def benchGeneration(config, size, seed):
+    genomes = createGenomes(config, size, seed)
+    profiler = PhaseProfiler()
+    simulation = Simulation(rng=random.Random(seed), profiler=profiler)
+
+    start = time.perf_counter()
+    simulation.evalGenomes(genomes, config)
+    seconds = time.perf_counter() - start
+
+    profile = profiler.flush(0)
+    car_ticks = profile["Cars Alive Per Tick"] * profile["Ticks"]
+    return {
+        "items": size,
+        "seconds": seconds,
+        "ticks": simulation.t,
+        "ticks_per_second": simulation.t / seconds,
+        "car_ticks_per_second": car_ticks / seconds,
+        "phases_ms_per_tick": {
+            k: v for (k, v) in profile.items() if k.endswith("ms/tick")
+        },
+    }
+
+
+def runMacro(config, sizes, seed):
+    # a few warm ticks first, so no generation pays for JIT compilation
+    warmSimulation(createGenomes(config, 10, seed), config, seed)
+    return {str(size): benchGeneration(config, size, seed) for size in sizes}
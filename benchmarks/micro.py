@@ -0,0 +1,92 @@
+import neat
+from .common import *
+from src.sensors import castRays
+from src.collision import HITBOX_RADIUS, detectCollisions
+
+
+def benchSensors(simulation, repeat):
+    (world, road, pop) = (simulation.world, simulation.road, simulation.pop)
+    idx = pop.aliveIndices()
+    (x, y, rot) = (pop.x[idx], pop.y[idx], pop.rot[idx])
+    cars = carsFromState(pop, idx)
+
+    def optimized():
+        ids = road.segmentsInRange(y.min() - SENSOR_DISTANCE, y.max() + SENSOR_DISTANCE)
+        castRays(road.getSegments(ids), road.getLines(ids), x, y, rot)
+
+    def reference():
+        for car in cars:
+            car.getInputs(world, road)
+
+    # the first call compiles or loads the JIT kernels when numba is active
+    optimized()
+    return {
+        "items": len(idx),
+        "seconds": timeCall(optimized, repeat),
+        "reference_seconds": timeCall(reference, repeat),
+    }
+
+
+def benchCollision(simulation, repeat):
+    (road, pop) = (simulation.road, simulation.pop)
+    idx = pop.aliveIndices()
+    (x, y, rot) = (pop.x[idx], pop.y[idx], pop.rot[idx])
+    cars = carsFromState(pop, idx)
+
+    def optimized():
+        ids = road.segmentsInRange(y.min() - HITBOX_RADIUS, y.max() + HITBOX_RADIUS)
+        detectCollisions(road.getSegments(ids), x, y, rot)
+
+    def reference():
+        for car in cars:
+            car.detectCollision(road)
+
+    optimized()
+    return {
+        "items": len(idx),
+        "seconds": timeCall(optimized, repeat),
+        "reference_seconds": timeCall(reference, repeat),
+    }
+
+
+def benchCreateSegment(simulation, repeat, segments=100):
+    road = simulation.road
+
+    def optimized():
+        for _ in range(segments):
+            road.createSegment(road.last_ctrl_point)
+
+    return {"items": segments, "seconds": timeCall(optimized, repeat)}
+
+
+def benchActivation(simulation, repeat):
+    (pop, nets) = (simulation.pop, simulation.nets)
+    idx = pop.aliveIndices()
+    inputs = pop.inputs[idx]
+    references = [
+        neat.nn.FeedForwardNetwork.create(simulation.genomes[i], simulation.config)
+        for i in idx
+    ]
+
+    def optimized():
+        nets.activate(inputs, idx)
+
+    def reference():
+        for net, row in zip(references, inputs.tolist()):
+            net.activate(row)
+
+    return {
+        "items": len(idx),
+        "seconds": timeCall(optimized, repeat),
+        "reference_seconds": timeCall(reference, repeat),
+    }
+
+
+def runMicro(config, size, seed, repeat):
+    simulation = warmSimulation(createGenomes(config, size, seed), config, seed)
+    return {
+        "sensors": benchSensors(simulation, repeat),
+        "collision": benchCollision(simulation, repeat),
+        "activation": benchActivation(simulation, repeat),
+        "create_segment": benchCreateSegment(simulation, repeat),
+    }
@@ -0,0 +1,86 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import numpy as np
+from .common import loadConfig
+from .micro import runMicro
+from .macro import runMacro
+from .equivalence import runEquivalence
+from .startup import benchStartup
+from src import kernels
+
+
+def compare(results, baseline):
+    # baselines from before the kernel backend was recorded ran on NumPy
+    (new, old) = (results["meta"]["kernels"], baseline["meta"].get("kernels", "numpy"))
+    if new != old:
+        print(
+            "warning: kernel backend differs (%s baseline, %s now); "
+            "ratios compare backends, not changes" % (old, new)
+        )
+    rows = [("startup", "import", results["startup"], baseline.get("startup"))]
+    for section in ["micro", "macro"]:
+        for name, new in results.get(section, {}).items():
+            rows.append((section, name, new, baseline.get(section, {}).get(name)))
+
+    for section, name, new, old in rows:
+        if old is not None:
+            ratio = new["seconds"] / old["seconds"]
+            print(
+                "%-7s %-16s %10.6fs -> %10.6fs  x%.2f"
+                % (section, name, old["seconds"], new["seconds"], ratio)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--micro-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="also check sharded fitness against a single process",
+    )
+    parser.add_argument("--skip-macro", action="store_true")
+    parser.add_argument("--output", default=None, help="write results as JSON")
+    parser.add_argument("--compare", default=None, help="baseline JSON to diff")
+    args = parser.parse_args()
+
+    config = loadConfig()
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+        },
+        "startup": benchStartup(args.repeat),
+        "equivalence": runEquivalence(config, 50, args.seed, args.workers),
+        "micro": runMicro(config, args.micro_size, args.seed, args.repeat),
+    }
+    if not args.skip_macro:
+        results["macro"] = runMacro(config, args.sizes, args.seed)
+    # read after the runs, once a failed numba import has fallen back
+    results["meta"]["kernels"] = kernels.backend()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    checks = list(results["equivalence"].values()) + [results["startup"]]
+    if not all(r["ok"] for r in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
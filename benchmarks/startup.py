@@ -0,0 +1,33 @@
+import sys
+import time
+import subprocess
+from .common import ROOT
+
+CORE_MODULES = "src.simulation, src.parallel, src.track, src.checkpoint"
+PROBE = (
+    "import sys, "
+    + CORE_MODULES
+    + "; print(int('pygame' in sys.modules), int('scipy' in sys.modules))"
+)
+
+
+def benchStartup(repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        best = min(best, time.perf_counter() - start)
+
+    (pygame, scipy) = out.split()
+    return {
+        "seconds": best,
+        "pygame_loaded": pygame == "1",
+        "scipy_loaded": scipy == "1",
+        "ok": pygame == "0" and scipy == "0",
+    }
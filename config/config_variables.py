@@ -1,15 +1,24 @@
-import pygame as py
-
-py.font.init()
-
-
-
 FPS = 30
+RENDER_BACKEND = "window"
+RENDER_EVERY = 1
+STREAM_WIDTH = 900
+STREAM_FPS = 15
+PROFILE = False
+PROFILE_LOG = "profile.jsonl"
+STATS_LOG = "stats.csv"
+SPECIES_STATS_LOG = "species_stats.csv"
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_INTERVAL = 5
+CHECKPOINT_KEEP = 2
 WIN_WIDTH = 1800
 WIN_HEIGHT = 1000
 STARTING_POS = (WIN_WIDTH / 2, WIN_HEIGHT - 100)
 SCORE_VEL_MULTIPLIER = 0.00
 BAD_GENOME_TRESHOLD = 200
+STAGNATION_TICKS = 90
+STAGNATION_DISTANCE = 50
+MAX_GENERATION_TICKS = 20000
+MAX_GENERATION_SECONDS = 300
 
 INPUT_NEURONS = 9
 OUTPUT_NEURONS = 4
@@ -22,8 +31,21 @@ MAX_VEL_REDUCTION = 1
 ACC_STRENGHT = 0.2
 BRAKE_STREGHT = 1
 TURN_VEL = 2
+DECISION_INTERVAL = 1
+TIMESTEP = 1.0
+NUM_TRACKS = 1
+TRACK_AGGREGATE = "mean"
 SENSOR_DISTANCE = 200
+SENSOR_BATCH = 1024
+KERNEL_BACKEND = "auto"
 ACTIVATION_TRESHOLD = 0.5
+CAR_WIDTH = 69
+CAR_LENGTH = 120
+SPRITE_ROTATION_STEP = 2
+CAR_SPRITES = ["yellow_car.png", "red_car.png", "blu_car.png", "green_car.png"]
+BRAKE_SPRITE = "brakes.png"
+HITBOX_WIDTH = 51
+HITBOX_LENGTH = 100
 
 
 ROAD_DBG = False
@@ -33,6 +55,7 @@ SPACING = 200
 NUM_POINTS = 15
 SAFE_SPACE = SPACING + 50
 ROAD_WIDTH = 200
+INDEX_BAND = 100
 
 
 NODE_RADIUS = 20
@@ -55,8 +78,9 @@ BLUE = (0, 0, 255)
 BLUE_PALE = (200, 200, 255)
 DARK_BLUE = (100, 100, 150)
 
-NODE_FONT = py.font.SysFont("comicsans", 15)
-STAT_FONT = py.font.SysFont("comicsans", 50)
+FONT_NAME = "comicsans"
+NODE_FONT_SIZE = 15
+STAT_FONT_SIZE = 50
 
 
 GEN = 0
@@ -1,13 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import os
 import sys
+import queue
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from dashboard.simulation import SimulationRunner, set_stop_simulation
+from dashboard.simulation import SimulationRunner, SimulationWorker
 
 st.set_page_config(page_title="Self-Driving Car Dashboard", layout="wide")
 
@@ -53,13 +53,29 @@ st.markdown("### Neural Evolution of Augmenting Topologies (NEAT)")
 
 st.sidebar.header("Control Panel")
 
+resume = st.sidebar.checkbox("Resume from latest checkpoint", value=True)
+
+worker = st.session_state.get("worker")
+
 if st.sidebar.button("▶ Start Simulation", type="primary"):
-    st.session_state["running"] = True
-    set_stop_simulation(False)
+    if worker is None or not worker.is_alive():
+        config_path = os.path.join(
+            os.path.dirname(__file__), "..", "config", "config_file.txt"
+        )
+        worker = SimulationWorker(SimulationRunner(config_path, resume=resume))
+        worker.start()
+        st.session_state["worker"] = worker
+    else:
+        worker.runner.resume()
+
+if st.sidebar.button("⏸ Pause Simulation", type="secondary"):
+    if worker is not None:
+        worker.runner.pause()
 
 if st.sidebar.button("⏹ Stop Simulation", type="secondary"):
-    st.session_state["running"] = False
-    set_stop_simulation(True)
+    if worker is not None:
+        worker.runner.stop()
+        worker.join()
 
 st.markdown("---")
 
@@ -87,12 +103,14 @@ with col1:
     st.subheader("Live Feed")
     frame_placeholder = st.empty()
 
-    if not st.session_state.get("running"):
+    if worker is None or not worker.is_alive():
         frame_placeholder.info("Click 'Start Simulation' in the sidebar to begin.")
 
 with col2:
     st.subheader("Analytics")
-    tab1, tab2 = st.tabs(["fitness_chart", "raw_data"])
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["fitness_chart", "raw_data", "species", "profile"]
+    )
 
     with tab1:
         st.caption("Max (Red) vs Average (Gray) Fitness over Generations")
@@ -102,51 +120,80 @@ with col2:
         st.caption("Detailed Statistics")
         stats_table = st.empty()
 
-
-if st.session_state.get("running"):
-    status_ind.metric("Status", "Running")
-
-    config_path = os.path.join(
-        os.path.dirname(__file__), "..", "config", "config_file.txt"
+    with tab3:
+        st.caption("Species in the latest generation")
+        species_table = st.empty()
+
+    with tab4:
+        st.caption("Per-phase time per tick (enable PROFILE in config_variables.py)")
+        profile_table = st.empty()
+
+
+view = {"rows": 0, "chart": None, "table": None}
+
+
+def showStats(stats, species_stats, profiles):
+    # only rows added since the last call are sent to the chart and the table
+    start = view["rows"]
+    if len(stats) == start:
+        return
+    (columns, view["rows"]) = stats.columnsFrom(start)
+
+    latest = stats.last(view["rows"])
+    curr_gen.metric("Generation", int(latest["Generation"]))
+    max_fit.metric("Max Fitness", f"{latest['Max Fitness']:.2f}")
+    avg_fit.metric("Avg Fitness", f"{latest['Average Fitness']:.2f}")
+
+    df = pd.DataFrame(columns).set_index("Generation")
+    fitness = df[["Max Fitness", "Average Fitness"]]
+    if view["chart"] is None:
+        view["chart"] = chart_placeholder.line_chart(
+            fitness, color=["#ff4b4b", "#808080"]
+        )
+        view["table"] = stats_table.dataframe(df, use_container_width=True)
+    else:
+        view["chart"].add_rows(fitness)
+        view["table"].add_rows(df)
+
+    # the latest generation's rows from the whole store, not from a cursor
+    (columns, _) = species_stats.columnsFrom(0)
+    latest_rows = columns["Generation"] == latest["Generation"]
+    species = pd.DataFrame(
+        {name: values[latest_rows] for (name, values) in columns.items()}
+    )
+    species_table.dataframe(
+        species,
+        hide_index=True,
+        use_container_width=True,
     )
 
-    runner = SimulationRunner(config_path)
-
-    try:
-        runner_iterator = runner.run()
-
-        for msg_type, data in runner_iterator:
-            if not st.session_state.get("running"):
-                break
-
-            if msg_type == "frame":
+    if profiles:
+        profile_table.dataframe(
+            pd.DataFrame(profiles).sort_values(by="Generation", ascending=False),
+            use_container_width=True,
+        )
 
-                frame = np.transpose(data, (1, 0, 2))
-                frame_placeholder.image(frame, channels="RGB", use_container_width=True)
 
-            elif msg_type == "stats":
+if worker is not None:
+    # the worker keeps simulating on its own thread; this loop only paints
+    while worker.is_alive():
+        status_ind.metric("Status", "Paused" if worker.runner.paused() else "Running")
 
-                if data:
-                    latest = data[-1]
-                    curr_gen.metric("Generation", latest["Generation"])
-                    max_fit.metric("Max Fitness", f"{latest['Max Fitness']:.2f}")
-                    avg_fit.metric("Avg Fitness", f"{latest['Average Fitness']:.2f}")
+        try:
+            frame_placeholder.image(
+                worker.frames.get(timeout=0.5), use_container_width=True
+            )
+        except queue.Empty:
+            pass
 
-                    df = pd.DataFrame(data)
-                    chart_placeholder.line_chart(
-                        df.set_index("Generation")[["Max Fitness", "Average Fitness"]],
-                        color=["#ff4b4b", "#808080"],
-                    )
-                    stats_table.dataframe(
-                        df.sort_values(by="Generation", ascending=False).head(10),
-                        use_container_width=True,
-                    )
+        showStats(worker.stats, worker.runner.reporter.species_stats, worker.profiles)
 
-    except KeyboardInterrupt:
+    showStats(worker.stats, worker.runner.reporter.species_stats, worker.profiles)
+    if worker.error is not None:
+        st.error(f"An error occurred: {worker.error}")
+    elif worker.runner.stopped.is_set():
         st.warning("Simulation Stopped.")
-        status_ind.metric("Status", "Stopped")
-    except Exception as e:
-        st.error(f"An error occurred: {e}")
+    status_ind.metric("Status", "Stopped")
 
 else:
     status_ind.metric("Status", "Stopped")
@@ -1,10 +1,33 @@
 from neat.reporting import BaseReporter
+from src.profiler import NullProfiler
+from dashboard.stats import StatsStore
+import numpy as np
 import time
 
+STATS_COLUMNS = [
+    ("Generation", int),
+    ("Max Fitness", float),
+    ("Average Fitness", float),
+    ("Std Dev", float),
+    ("Best Genome ID", int),
+    ("Species", int),
+]
+SPECIES_COLUMNS = [
+    ("Generation", int),
+    ("Species ID", int),
+    ("Size", int),
+    ("Max Fitness", float),
+    ("Average Fitness", float),
+    ("Std Dev", float),
+]
+
 
 class NEATReporter(BaseReporter):
-    def __init__(self):
-        self.stats = []
+    def __init__(self, profiler=None, stats_path=None, species_path=None):
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.stats = StatsStore(STATS_COLUMNS, stats_path)
+        self.species_stats = StatsStore(SPECIES_COLUMNS, species_path)
+        self.profiles = []
         self.current_gen = 0
         self.generation_start_time = None
 
@@ -14,21 +37,53 @@ class NEATReporter(BaseReporter):
 
     def post_evaluate(self, config, population, species, best_genome):
 
-        fitnesses = [c.fitness for c in population.values()]
-        fit_mean = sum(fitnesses) / len(fitnesses)
-        fit_std = (
-            sum([(x - fit_mean) ** 2 for x in fitnesses]) / len(fitnesses)
-        ) ** 0.5
+        keys = np.fromiter(population.keys(), dtype=int, count=len(population))
+        fitnesses = np.fromiter(
+            (c.fitness for c in population.values()), dtype=float, count=len(keys)
+        )
+
+        # map every genome to its species and reduce each group in one pass
+        species_of = {}
+        for sid, s in species.species.items():
+            for gid in s.members:
+                species_of[gid] = sid
+        sids = np.array([species_of.get(k, -1) for k in keys])
+        (ids, groups, sizes) = np.unique(sids, return_inverse=True, return_counts=True)
+        sums = np.bincount(groups, fitnesses)
+        means = sums / sizes
+        stds = np.sqrt(np.bincount(groups, (fitnesses - means[groups]) ** 2) / sizes)
+        maxima = np.full(len(ids), -np.inf)
+        np.maximum.at(maxima, groups, fitnesses)
 
+        self.species_stats.extend(
+            {
+                "Generation": np.full(len(ids), self.current_gen),
+                "Species ID": ids,
+                "Size": sizes,
+                "Max Fitness": maxima,
+                "Average Fitness": means,
+                "Std Dev": stds,
+            }
+        )
+
+        # the UI repaints when a stats row lands, so the species rows go first
         self.stats.append(
             {
                 "Generation": self.current_gen,
                 "Max Fitness": best_genome.fitness,
-                "Average Fitness": fit_mean,
-                "Std Dev": fit_std,
+                "Average Fitness": fitnesses.mean(),
+                "Std Dev": fitnesses.std(),
                 "Best Genome ID": best_genome.key,
+                "Species": len(species.species),
             }
         )
 
+        profile = self.profiler.flush(self.current_gen)
+        if profile is not None:
+            self.profiles.append(profile)
+
     def get_stats(self):
         return self.stats
+
+    def get_profiles(self):
+        return self.profiles
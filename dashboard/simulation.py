@@ -1,34 +1,28 @@
 import sys
 import os
-import pygame as py
+import queue
+import threading
 import neat
-import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.car import Car
-from src.road import Road
-from src.world import World
-from src.NNdraw import NN
+from src.simulation import Simulation
+from src.render import StreamBackend
+from src.profiler import createProfiler
 from config.config_variables import *
+from src.checkpoint import (
+    AsyncCheckpointer,
+    latestCheckpoint,
+    restoreCheckpoint,
+    rotateCheckpoints,
+)
 from dashboard.reporter import NEATReporter
 
 os.environ["SDL_VIDEODRIVER"] = "dummy"
-STOP_SIMULATION = False
-
-
-def set_stop_simulation(value):
-    global STOP_SIMULATION
-    STOP_SIMULATION = value
-
-
-def get_stop_simulation():
-    global STOP_SIMULATION
-    return STOP_SIMULATION
 
 
 class SimulationRunner:
-    def __init__(self, config_path):
+    def __init__(self, config_path, checkpoint_dir=CHECKPOINT_DIR, resume=False):
         self.config_path = config_path
         self.config = neat.config.Config(
             neat.DefaultGenome,
@@ -37,130 +31,74 @@ class SimulationRunner:
             neat.DefaultStagnation,
             config_path,
         )
-        self.population = neat.Population(self.config)
-        self.reporter = NEATReporter()
+        self.profiler = createProfiler(PROFILE_LOG)
+
+        # checkpoints are shared with main.py, which keeps its reporter state
+        # under its own key; a missing "dashboard" entry means fresh stats
+        checkpoint = latestCheckpoint(checkpoint_dir) if resume else None
+        saved = None
+        if checkpoint:
+            self.population, state = restoreCheckpoint(checkpoint, self.config)
+            saved = (state or {}).get("dashboard")
+        else:
+            self.population = neat.Population(self.config)
+            rotateCheckpoints(checkpoint_dir)
+
+        if saved:
+            self.reporter = NEATReporter(self.profiler)
+            self.reporter.stats = saved["stats"]
+            self.reporter.species_stats = saved["species_stats"]
+            self.reporter.stats.rewrite()
+            self.reporter.species_stats.rewrite()
+        else:
+            self.reporter = NEATReporter(self.profiler, STATS_LOG, SPECIES_STATS_LOG)
         self.population.add_reporter(self.reporter)
 
-        self.population.add_reporter(neat.StdOutReporter(True))
-
-        py.font.init()
-        self.bg = py.Surface((WIN_WIDTH, WIN_HEIGHT))
-        self.bg.fill(GRAY)
-
-    def eval_genomes(self, genomes, config):
-        global GEN
+        self.checkpointer = AsyncCheckpointer(
+            checkpoint_dir,
+            state=lambda: {
+                "dashboard": {
+                    "stats": self.reporter.stats,
+                    "species_stats": self.reporter.species_stats,
+                }
+            },
+        )
 
-        if get_stop_simulation():
+        self.population.add_reporter(neat.StdOutReporter(True))
 
-            raise KeyboardInterrupt("Stopped by user")
+        self.simulation = Simulation(StreamBackend(), profiler=self.profiler)
 
-        nets = []
-        ge = []
-        cars = []
-        t = 0
+        self.stopped = threading.Event()
+        self.unpaused = threading.Event()
+        self.unpaused.set()
 
-        world = World(STARTING_POS, WIN_WIDTH, WIN_HEIGHT)
-        world.win.blit(self.bg, (0, 0))
+    def pause(self):
+        self.unpaused.clear()
 
-        NNs = []
+    def resume(self):
+        self.unpaused.set()
 
-        for _, g in genomes:
-            net = neat.nn.FeedForwardNetwork.create(g, config)
-            nets.append(net)
-            cars.append(Car(0, 0, 0))
-            g.fitness = 0
-            ge.append(g)
-            NNs.append(NN(config, g, (90, 210)))
+    def stop(self):
+        self.stopped.set()
+        self.unpaused.set()
 
-        road = Road(world)
-        clock = py.time.Clock()
+    def paused(self):
+        return not self.unpaused.is_set()
 
-        run = True
-        while run:
-            if get_stop_simulation():
-                run = False
-                py.quit()
+    def eval_genomes(self, genomes, config):
+        for frame in self.simulation.run(genomes, config, self.population.generation):
+            self.unpaused.wait()
+            if self.stopped.is_set():
                 raise KeyboardInterrupt("Stopped by user")
 
-            t += 1
-
-            clock.tick(FPS)
-            world.updateScore(0)
-
-            for event in py.event.get():
-                if event.type == py.QUIT:
-                    run = False
-                    py.quit()
-                    return
-
-            (xb, yb) = (0, 0)
-            i = 0
-            while i < len(cars):
-                car = cars[i]
-
-                input = car.getInputs(world, road)
-                input.append(car.vel / MAX_VEL)
-                car.commands = nets[i].activate(tuple(input))
-
-                y_old = car.y
-                (x, y) = car.move(road, t)
-
-                if t > 10 and (
-                    car.detectCollision(road)
-                    or y > world.getBestCarPos()[1] + BAD_GENOME_TRESHOLD
-                    or y > y_old
-                    or car.vel < 0.1
-                ):
-                    ge[i].fitness -= 1
-                    cars.pop(i)
-                    nets.pop(i)
-                    ge.pop(i)
-                    NNs.pop(i)
-                else:
-                    ge[i].fitness += -(y - y_old) / 100 + car.vel * SCORE_VEL_MULTIPLIER
-                    if ge[i].fitness > world.getScore():
-                        world.updateScore(ge[i].fitness)
-                        world.bestNN = NNs[i]
-                        world.bestInputs = input
-                        world.bestCommands = car.commands
-                    i += 1
-
-                if y < yb:
-                    (xb, yb) = (x, y)
-
-            if len(cars) == 0:
-                run = False
-                break
-
-            world.updateBestCarPos((xb, yb))
-            road.update(world)
-
-            road.draw(world)
-            for car in cars:
-                car.draw(world)
-
-            text = STAT_FONT.render(
-                "Best Car Score: " + str(int(world.getScore())), 1, BLACK
-            )
-            world.win.blit(text, (world.win_width - text.get_width() - 10, 10))
-
-            if world.bestNN:
-                world.bestNN.draw(world)
-
-            py.display.update()
-
-            frame = py.surfarray.array3d(world.win)
             yield frame
 
-            world.win.blit(self.bg, (0, 0))
-
-        pass
-
     def run(self):
 
         n = 10000
         for i in range(n):
             self.reporter.start_generation(self.population.generation)
+            self.checkpointer.start_generation(self.population.generation)
 
             logger = self.reporter
 
@@ -186,15 +124,57 @@ class SimulationRunner:
                 fitness = best.fitness
 
             if fitness >= self.config.fitness_threshold:
+                self.checkpointer.wait()
                 break
 
-            self.population.species.speciate(
-                self.config, self.population.population, self.population.generation
-            )
             self.population.population = self.population.reproduction.reproduce(
                 self.config,
                 self.population.species,
                 self.config.pop_size,
                 self.population.generation,
             )
+            # as in neat.Population.run, species always describe the current population
+            self.population.species.speciate(
+                self.config, self.population.population, self.population.generation
+            )
+            self.checkpointer.end_generation(
+                self.config, self.population.population, self.population.species
+            )
             self.population.generation += 1
+
+
+class SimulationWorker(threading.Thread):
+    def __init__(self, runner, max_frames=2):
+        super().__init__(daemon=True)
+        self.runner = runner
+        self.frames = queue.Queue(maxsize=max_frames)
+        self.stats = runner.reporter.stats
+        self.profiles = []
+        self.error = None
+
+    def run(self):
+        try:
+            for msg_type, data in self.runner.run():
+                if msg_type == "frame":
+                    self.publish(data)
+                elif msg_type == "stats":
+                    self.stats = data
+                    self.profiles = list(self.runner.reporter.get_profiles())
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            self.runner.checkpointer.wait()
+
+    def publish(self, frame):
+        # the UI only ever wants the newest frame, so stale ones are dropped
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
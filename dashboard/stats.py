@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class StatsStore:
+    def __init__(self, columns, path=None, capacity=1024):
+        self.columns = columns
+        self.path = path
+        self.size = 0
+        self.data = {name: np.zeros(capacity, dtype=dtype) for (name, dtype) in columns}
+
+        self.rewrite()
+
+    def __getstate__(self):
+        # checkpoints carry the filled rows, not the spare capacity
+        state = self.__dict__.copy()
+        state["data"] = {
+            name: values[: self.size] for (name, values) in self.data.items()
+        }
+        return state
+
+    def __len__(self):
+        return self.size
+
+    def append(self, row):
+        self.extend({name: [value] for (name, value) in row.items()})
+
+    def extend(self, rows):
+        count = len(rows[self.columns[0][0]])
+        capacity = len(self.data[self.columns[0][0]])
+        if self.size + count > capacity:
+            capacity = max(2 * capacity, self.size + count)
+            for name in self.data:
+                grown = np.zeros(capacity, dtype=self.data[name].dtype)
+                grown[: self.size] = self.data[name][: self.size]
+                self.data[name] = grown
+
+        for name in self.data:
+            self.data[name][self.size : self.size + count] = rows[name]
+        # size moves only after the rows are in place; readers take it once
+        self.size += count
+
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                self.write(f, self.size - count)
+
+    def rewrite(self):
+        # after a restore the file is cut back to the rows this store holds
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                f.write(",".join(self.data) + "\n")
+                self.write(f, 0)
+
+    def write(self, f, start):
+        for i in range(start, self.size):
+            f.write(",".join(str(values[i]) for values in self.data.values()) + "\n")
+
+    def columnsFrom(self, start=0):
+        # the simulation thread may append meanwhile, so every column is cut
+        # at one size, which is returned for the caller's next start
+        size = self.size
+        columns = {name: values[start:size] for (name, values) in self.data.items()}
+        return (columns, size)
+
+    def last(self, end=None):
+        size = self.size if end is None else end
+        return {name: values[size - 1] for (name, values) in self.data.items()}
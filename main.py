@@ -1,118 +1,42 @@
-import pygame as py
 import neat
-import time
 import os
-import random
-from src.car import Car
-from src.road import Road
-from src.world import World
-from src.NNdraw import NN
+import argparse
+from src.simulation import Simulation, AGGREGATES
+from src.backend import createBackend
+from src.parallel import ShardedEvaluator
+from src.track import StoredTrack
+from src.profiler import PhaseProfiler
+from src.replay import TrajectoryRecorder
+from src.checkpoint import (
+    AsyncCheckpointer,
+    latestCheckpoint,
+    restoreCheckpoint,
+    rotateCheckpoints,
+)
 from config.config_variables import *
 
-py.font.init()
 
-
-bg = py.Surface((WIN_WIDTH, WIN_HEIGHT))
-bg.fill(GRAY)
-
-
-def draw_win(cars, road, world, GEN):
-    road.draw(world)
-    for car in cars:
-        car.draw(world)
-
-    text = STAT_FONT.render("Best Car Score: " + str(int(world.getScore())), 1, BLACK)
-    world.win.blit(text, (world.win_width - text.get_width() - 10, 10))
-    text = STAT_FONT.render("Gen: " + str(GEN), 1, BLACK)
-    world.win.blit(text, (world.win_width - text.get_width() - 10, 50))
-    world.bestNN.draw(world)
-
-    py.display.update()
-    world.win.blit(bg, (0, 0))
+simulation = None
 
 
 def main(genomes=[], config=[]):
-    global GEN
+    global GEN, simulation
     GEN += 1
+    if simulation is None:
+        simulation = Simulation(createBackend(RENDER_BACKEND))
 
-    nets = []
-    ge = []
-    cars = []
-    t = 0
-
-    world = World(STARTING_POS, WIN_WIDTH, WIN_HEIGHT)
-    world.win.blit(bg, (0, 0))
-
-    NNs = []
-
-    for _, g in genomes:
-        net = neat.nn.FeedForwardNetwork.create(g, config)
-        nets.append(net)
-        cars.append(Car(0, 0, 0))
-        g.fitness = 0
-        ge.append(g)
-        NNs.append(NN(config, g, (90, 210)))
-
-    road = Road(world)
-    clock = py.time.Clock()
-
-    run = True
-    while run:
-        t += 1
-        clock.tick(FPS)
-        world.updateScore(0)
-
-        for event in py.event.get():
-            if event.type == py.QUIT:
-                run = False
-                py.quit()
-                quit()
-
-        (xb, yb) = (0, 0)
-        i = 0
-        while i < len(cars):
-            car = cars[i]
-
-            input = car.getInputs(world, road)
-            input.append(car.vel / MAX_VEL)
-            car.commands = nets[i].activate(tuple(input))
-
-            y_old = car.y
-            (x, y) = car.move(road, t)
-
-            if t > 10 and (
-                car.detectCollision(road)
-                or y > world.getBestCarPos()[1] + BAD_GENOME_TRESHOLD
-                or y > y_old
-                or car.vel < 0.1
-            ):
-                ge[i].fitness -= 1
-                cars.pop(i)
-                nets.pop(i)
-                ge.pop(i)
-                NNs.pop(i)
-            else:
-                ge[i].fitness += -(y - y_old) / 100 + car.vel * SCORE_VEL_MULTIPLIER
-                if ge[i].fitness > world.getScore():
-                    world.updateScore(ge[i].fitness)
-                    world.bestNN = NNs[i]
-                    world.bestInputs = input
-                    world.bestCommands = car.commands
-                i += 1
-
-            if y < yb:
-                (xb, yb) = (x, y)
-
-        if len(cars) == 0:
-            run = False
-            break
-
-        world.updateBestCarPos((xb, yb))
-        road.update(world)
-        draw_win(cars, road, world, GEN)
+    simulation.evalGenomes(genomes, config, GEN)
+    simulation.profiler.flush(GEN)
 
 
-def run(config_path):
+def run(
+    config_path,
+    workers=1,
+    track_path=None,
+    checkpoint_dir=None,
+    resume=False,
+    simulation_args=None,
+):
     config = neat.config.Config(
         neat.DefaultGenome,
         neat.DefaultReproduction,
@@ -121,16 +45,154 @@ def run(config_path):
         config_path,
     )
 
-    p = neat.Population(config)
+    global GEN
+    checkpoint = latestCheckpoint(checkpoint_dir) if resume and checkpoint_dir else None
+    if checkpoint:
+        # the statistics reporter keeps every generation's best genome, so it
+        # is not checkpointed and starts fresh on resume
+        p, _ = restoreCheckpoint(checkpoint, config)
+        GEN = p.generation
+        print("Resuming from " + checkpoint)
+    else:
+        p = neat.Population(config)
 
     p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
-    p.add_reporter(stats)
+    p.add_reporter(neat.StatisticsReporter())
+
+    checkpointer = None
+    if checkpoint_dir:
+        if not checkpoint:
+            rotateCheckpoints(checkpoint_dir)
+        checkpointer = AsyncCheckpointer(checkpoint_dir)
+        p.add_reporter(checkpointer)
+
+    if workers > 1:
+        evaluator = ShardedEvaluator(
+            workers, track_path=track_path, simulation_args=simulation_args
+        )
+        winner = p.run(evaluator.evaluate, 10000)
+        evaluator.stop()
+    else:
+        winner = p.run(main, 10000)
 
-    winner = p.run(main, 10000)
+    if checkpointer:
+        checkpointer.wait()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--backend",
+        choices=["window", "null", "capture"],
+        default=RENDER_BACKEND,
+        help="render backend; 'null' runs headless and uncapped",
+    )
+    parser.add_argument(
+        "--render-every",
+        type=int,
+        default=RENDER_EVERY,
+        help="draw only every Nth simulation tick",
+    )
+    parser.add_argument(
+        "--decision-interval",
+        type=int,
+        default=DECISION_INTERVAL,
+        help="sense and run the networks every N ticks, holding commands in between",
+    )
+    parser.add_argument(
+        "--timestep",
+        type=float,
+        default=TIMESTEP,
+        help="simulated time per tick; larger steps cover the track in fewer ticks",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="append per-generation phase timings to this JSON-lines file",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="save every generation's trajectories to this directory for replay",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="shard each generation across this many processes (headless only)",
+    )
+    parser.add_argument(
+        "--track",
+        nargs="+",
+        default=None,
+        help="stream every generation from stored tracks (see src/track.py); "
+        "several paths score each genome on all of them",
+    )
+    parser.add_argument(
+        "--tracks",
+        type=int,
+        default=NUM_TRACKS,
+        help="score each genome on this many generated tracks in one batched pass",
+    )
+    parser.add_argument(
+        "--aggregate",
+        choices=sorted(AGGREGATES),
+        default=TRACK_AGGREGATE,
+        help="combine per-track fitness with the mean or the worst track",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="write a checkpoint every CHECKPOINT_INTERVAL generations to this directory",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the latest checkpoint in --checkpoint-dir",
+    )
+    args = parser.parse_args()
+    if args.render_every < 1:
+        parser.error("--render-every must be at least 1")
+    if args.decision_interval < 1:
+        parser.error("--decision-interval must be at least 1")
+    if args.timestep <= 0:
+        parser.error("--timestep must be positive")
+    # shards build their own simulations, which neither profile nor record
+    if args.workers > 1 and (args.profile or args.record):
+        parser.error("--profile and --record need a single process (--workers 1)")
+    track_path = args.track
+    if args.tracks < 1:
+        parser.error("--tracks must be at least 1")
+    if track_path and args.tracks > 1 and len(track_path) != args.tracks:
+        parser.error("--tracks needs one --track path per track")
+    if track_path and len(track_path) == 1:
+        track_path = track_path[0]
+    if isinstance(track_path, list):
+        track = [StoredTrack(path) for path in track_path]
+    else:
+        track = StoredTrack(track_path) if track_path else None
+    simulation_args = {
+        "decision_interval": args.decision_interval,
+        "dt": args.timestep,
+        "num_tracks": args.tracks,
+        "aggregate": args.aggregate,
+    }
+    simulation = Simulation(
+        createBackend(args.backend),
+        track=track,
+        render_every=args.render_every,
+        profiler=PhaseProfiler(args.profile) if args.profile else None,
+        recorder=TrajectoryRecorder(args.record) if args.record else None,
+        **simulation_args,
+    )
+
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, "config", "config_file.txt")
-    run(config_path)
+    run(
+        config_path,
+        args.workers,
+        track_path,
+        args.checkpoint_dir,
+        args.resume,
+        simulation_args,
+    )
@@ -4,8 +4,6 @@ from .car import decodeCommand
 from .vect2d import vect2d
 from .node import *
 
-py.font.init()
-
 
 class NN:
     def __init__(self, config, genome, pos):
@@ -27,7 +25,7 @@ class NN:
         ]
         output_names = ["Accelerate", "Brake", "Turn Left", "Turn Right"]
         middle_nodes = [n for n in genome.nodes.keys()]
-        nodeIdList = []
+        nodeById = {}
 
         h = (INPUT_NEURONS - 1) * (NODE_RADIUS * 2 + NODE_SPACING)
         for i, input in enumerate(config.genome_config.input_keys):
@@ -41,7 +39,7 @@ class NN:
                 i,
             )
             self.nodes.append(n)
-            nodeIdList.append(input)
+            nodeById[input] = n
 
         h = (OUTPUT_NEURONS - 1) * (NODE_RADIUS * 2 + NODE_SPACING)
         for i, out in enumerate(config.genome_config.output_keys):
@@ -56,7 +54,7 @@ class NN:
             )
             self.nodes.append(n)
             middle_nodes.remove(out)
-            nodeIdList.append(out)
+            nodeById[out] = n
 
         h = (len(middle_nodes) - 1) * (NODE_RADIUS * 2 + NODE_SPACING)
         for i, m in enumerate(middle_nodes):
@@ -68,22 +66,38 @@ class NN:
                 [BLUE_PALE, DARK_BLUE, BLUE_PALE, DARK_BLUE],
             )
             self.nodes.append(n)
-            nodeIdList.append(m)
+            nodeById[m] = n
 
         self.connections = []
         for c in genome.connections.values():
             if c.enabled:
                 input, output = c.key
                 self.connections.append(
-                    Connection(
-                        self.nodes[nodeIdList.index(input)],
-                        self.nodes[nodeIdList.index(output)],
-                        c.weight,
-                    )
+                    Connection(nodeById[input], nodeById[output], c.weight)
                 )
 
-    def draw(self, world):
+        self.surface = None
+
+    def buildSurface(self):
+        # connections and labels never change for a genome, so they are drawn once
+        labels = [(node, node.renderLabel()) for node in self.nodes]
+        rects = [c.getRect() for c in self.connections]
+        rects += [node.getRect() for node in self.nodes]
+        rects += [text.get_rect(topleft=node.labelPos(text)) for node, text in labels]
+        bounds = rects[0].unionall(rects[1:])
+
+        self.offset = bounds.topleft
+        self.surface = py.Surface(bounds.size, py.SRCALPHA)
         for c in self.connections:
-            c.drawConnection(world)
+            c.drawConnection(self.surface, self.offset)
+        for node, text in labels:
+            (x, y) = node.labelPos(text)
+            self.surface.blit(text, (x - self.offset[0], y - self.offset[1]))
+
+    def draw(self, world):
+        if self.surface is None:
+            self.buildSurface()
+
+        world.win.blit(self.surface, self.offset)
         for node in self.nodes:
             node.draw_node(world)
@@ -0,0 +1,34 @@
+from config.config_variables import *
+
+
+class NullBackend:
+    def open(self, width, height):
+        return None
+
+    def poll(self):
+        pass
+
+    def render(self, world, road, pop, gen):
+        return None
+
+    def close(self):
+        pass
+
+
+def createBackend(name):
+    # visual backends pull in pygame, so they are only imported when selected
+    if name == "null":
+        return NullBackend()
+    if name == "window":
+        from .render import WindowBackend
+
+        return WindowBackend()
+    if name == "capture":
+        from .render import CaptureBackend
+
+        return CaptureBackend()
+    if name == "stream":
+        from .render import StreamBackend
+
+        return StreamBackend()
+    raise ValueError("Unknown render backend: " + str(name))
@@ -1,11 +1,10 @@
 from config.config_variables import *
-import pygame as py
-import os
 from math import *
 from random import random
 from .road import *
 import numpy as np
 from .vect2d import vect2d
+from .collision import HITBOX_RADIUS, segmentHitsBox
 
 
 class Car:
@@ -23,35 +22,13 @@ class Car:
         self.commands = [0, 0, 0, 0]
 
     def initImgs(self):
-        img_names = ["yellow_car.png", "red_car.png", "blu_car.png", "green_car.png"]
-        name = img_names[floor(random() * len(img_names)) % len(img_names)]
-
-        self.img = py.transform.rotate(
-            py.transform.scale(
-                py.image.load(os.path.join("assets", name)).convert_alpha(), (120, 69)
-            ),
-            -90,
-        )
-        self.brake_img = py.transform.rotate(
-            py.transform.scale(
-                py.image.load(os.path.join("assets", "brakes.png")).convert_alpha(),
-                (120, 69),
-            ),
-            -90,
-        )
+        self.sprite = CAR_SPRITES[floor(random() * len(CAR_SPRITES)) % len(CAR_SPRITES)]
 
     def detectCollision(self, road):
-        mask = py.mask.from_surface(self.img)
-        (width, height) = mask.get_size()
-        for v in [road.pointsLeft, road.pointsRight]:
-            for p in v:
-                x = p.x - self.x + width / 2
-                y = p.y - self.y + height / 2
-                try:
-                    if mask.get_at((int(x), int(y))):
-                        return True
-                except IndexError as error:
-                    continue
+        ids = road.segmentsNear(self.x, self.y, HITBOX_RADIUS)
+        for segment in road.getSegments(ids):
+            if segmentHitsBox(self.x, self.y, self.rot, *segment):
+                return True
         return False
 
     def getInputs(self, world, road):
@@ -62,26 +39,19 @@ class Car:
 
         for v in [road.pointsLeft, road.pointsRight]:
             i = road.bottomPointIndex
-            while v[i].y > self.y - SENSOR_DISTANCE:
+            while v[i][1] > self.y - SENSOR_DISTANCE:
                 next_index = getPoint(i + 1, NUM_POINTS * road.num_ctrl_points)
 
-                getDistance(world, self, sensors, sensorsEquations, v[i], v[next_index])
+                getDistance(
+                    world,
+                    self,
+                    sensors,
+                    sensorsEquations,
+                    vect2d(*v[i]),
+                    vect2d(*v[next_index]),
+                )
                 i = next_index
 
-        if CAR_DBG:
-            for k, s in enumerate(sensors):
-                omega = radians(self.rot + 45 * k)
-                dx = s * sin(omega)
-                dy = -s * cos(omega)
-
-                if s < SENSOR_DISTANCE:
-                    py.draw.circle(
-                        world.win,
-                        RED,
-                        world.getScreenCoords(self.x + dx, self.y + dy),
-                        6,
-                    )
-
         for s in range(len(sensors)):
             sensors[s] = 1 - sensors[s] / SENSOR_DISTANCE
 
@@ -117,15 +87,13 @@ class Car:
         return (self.x, self.y)
 
     def draw(self, world):
+        from .sprites import blitSprite, getAtlas
+
         screen_position = world.getScreenCoords(self.x, self.y)
-        rotated_img = py.transform.rotate(self.img, -self.rot)
-        new_rect = rotated_img.get_rect(center=screen_position)
-        world.win.blit(rotated_img, new_rect.topleft)
+        blitSprite(world.win, getAtlas(self.sprite), self.rot, screen_position)
 
         if decodeCommand(self.commands, BRAKE):
-            rotated_img = py.transform.rotate(self.brake_img, -self.rot)
-            new_rect = rotated_img.get_rect(center=screen_position)
-            world.win.blit(rotated_img, new_rect.topleft)
+            blitSprite(world.win, getAtlas(BRAKE_SPRITE), self.rot, screen_position)
 
 
 def getSensorEquations(self, world):
@@ -134,18 +102,6 @@ def getSensorEquations(self, world):
         omega = radians(self.rot + 45 * i)
         dx = SENSOR_DISTANCE * sin(omega)
         dy = -SENSOR_DISTANCE * cos(omega)
-
-        if CAR_DBG:
-            py.draw.lines(
-                world.win,
-                GREEN,
-                False,
-                [
-                    world.getScreenCoords(self.x + dx, self.y + dy),
-                    world.getScreenCoords(self.x - dx, self.y - dy),
-                ],
-                2,
-            )
         coef = getSegmentEquation(self, vect2d(x=self.x + dx, y=self.y + dy))
         eq.append(coef)
     return eq
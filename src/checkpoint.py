@@ -0,0 +1,139 @@
+import os
+import pickle
+import random
+import shutil
+import threading
+import zlib
+from itertools import count
+import neat
+from neat.reporting import BaseReporter
+from config.config_variables import *
+
+CHECKPOINT_MAGIC = b"SDCK1"
+
+
+class AsyncCheckpointer(BaseReporter):
+    def __init__(
+        self,
+        directory,
+        generation_interval=CHECKPOINT_INTERVAL,
+        state=None,
+        keep=CHECKPOINT_KEEP,
+    ):
+        self.directory = directory
+        self.generation_interval = generation_interval
+        self.state = state
+        self.keep = keep
+        self.current_generation = 0
+        self.last_generation_checkpoint = None
+        self.writer = None
+
+    def __getstate__(self):
+        # The species set keeps a reference to every reporter, this one included.
+        state = self.__dict__.copy()
+        state["writer"] = None
+        state["state"] = None
+        return state
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        next_generation = self.current_generation + 1
+        if (
+            self.last_generation_checkpoint is None
+            or next_generation - self.last_generation_checkpoint
+            >= self.generation_interval
+        ):
+            self.save(config, population, species_set, next_generation)
+
+    def save(self, config, population, species_set, generation):
+        data = {
+            "generation": generation,
+            "population": population,
+            "species": species_set,
+            "random": random.getstate(),
+            "innovation_tracker": getattr(
+                config.genome_config, "innovation_tracker", None
+            ),
+            "state": self.state() if self.state is not None else None,
+        }
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.wait()
+        path = os.path.join(self.directory, "checkpoint-" + str(generation) + ".ckpt")
+        self.writer = threading.Thread(
+            target=self.write, args=(path, payload), daemon=True
+        )
+        self.writer.start()
+        self.last_generation_checkpoint = generation
+
+    def write(self, path, payload):
+        writeCheckpoint(path, payload)
+        # only the newest files are ever resumed from
+        for old in listCheckpoints(self.directory)[: -self.keep]:
+            os.remove(old)
+
+    def wait(self):
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+
+
+def writeCheckpoint(path, payload):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CHECKPOINT_MAGIC)
+        f.write(zlib.compress(payload, 1))
+    os.replace(tmp_path, path)
+
+
+def listCheckpoints(directory):
+    # oldest first by write order; generation breaks ties in the mtime
+    if not os.path.isdir(directory):
+        return []
+
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith("checkpoint-") and name.endswith(".ckpt"):
+            path = os.path.join(directory, name)
+            generation = int(name[len("checkpoint-") : -len(".ckpt")])
+            found.append((os.path.getmtime(path), generation, path))
+    return [path for (_, _, path) in sorted(found)]
+
+
+def latestCheckpoint(directory):
+    checkpoints = listCheckpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+def rotateCheckpoints(directory):
+    # a fresh run moves the previous run's checkpoints aside, so resuming
+    # never picks them up over the new run
+    checkpoints = listCheckpoints(directory)
+    if not checkpoints:
+        return
+    previous = os.path.join(directory, "previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    os.makedirs(previous)
+    for path in checkpoints:
+        os.replace(path, os.path.join(previous, os.path.basename(path)))
+
+
+def restoreCheckpoint(path, config):
+    with open(path, "rb") as f:
+        if f.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+            raise ValueError("Not a checkpoint file: " + path)
+        data = pickle.loads(zlib.decompress(f.read()))
+
+    random.setstate(data["random"])
+    p = neat.Population(
+        config, (data["population"], data["species"], data["generation"])
+    )
+    if hasattr(p.reproduction, "genome_indexer"):
+        p.reproduction.genome_indexer = count(max(data["population"]) + 1)
+    if data["innovation_tracker"] is not None:
+        p.reproduction.innovation_tracker = data["innovation_tracker"]
+        config.genome_config.innovation_tracker = data["innovation_tracker"]
+    return (p, data["state"])
@@ -0,0 +1,84 @@
+import numpy as np
+from math import radians, cos, sin
+from config.config_variables import *
+from . import kernels
+
+HITBOX_RADIUS = (HITBOX_WIDTH**2 + HITBOX_LENGTH**2) ** 0.5 / 2
+
+
+def detectCollisions(segments, x, y, rot):
+    collided = np.zeros(len(x), dtype=bool)
+    if len(x) == 0:
+        return collided
+
+    keep = (np.maximum(segments[:, 1], segments[:, 3]) > y.min() - HITBOX_RADIUS) & (
+        np.minimum(segments[:, 1], segments[:, 3]) < y.max() + HITBOX_RADIUS
+    )
+    segments = segments[keep]
+
+    if len(segments) > 0:
+        batch = kernels.select(detectCollisionsBatch, "detectCollisionsBatch")
+        for s in range(0, len(x), SENSOR_BATCH):
+            e = s + SENSOR_BATCH
+            collided[s:e] = batch(segments, x[s:e], y[s:e], rot[s:e])
+
+    return collided
+
+
+def detectCollisionsBatch(segments, x, y, rot):
+    rad = np.radians(rot)[:, None]
+    (c, s) = (np.cos(rad), np.sin(rad))
+
+    dx0 = segments[None, :, 0] - x[:, None]
+    dy0 = segments[None, :, 1] - y[:, None]
+    dx1 = segments[None, :, 2] - x[:, None]
+    dy1 = segments[None, :, 3] - y[:, None]
+
+    u0 = dx0 * c + dy0 * s
+    v0 = dx0 * s - dy0 * c
+    u1 = dx1 * c + dy1 * s
+    v1 = dx1 * s - dy1 * c
+
+    near = (np.minimum(v0, v1) <= HITBOX_LENGTH / 2) & (
+        np.maximum(v0, v1) >= -HITBOX_LENGTH / 2
+    )
+    near &= (np.minimum(u0, u1) <= HITBOX_WIDTH / 2) & (
+        np.maximum(u0, u1) >= -HITBOX_WIDTH / 2
+    )
+
+    tmin = np.zeros(near.shape)
+    tmax = np.ones(near.shape)
+    for p, d, h in [(u0, u1 - u0, HITBOX_WIDTH / 2), (v0, v1 - v0, HITBOX_LENGTH / 2)]:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t1 = (-h - p) / d
+            t2 = (h - p) / d
+        flat = d == 0
+        tmin = np.where(flat, tmin, np.maximum(tmin, np.minimum(t1, t2)))
+        tmax = np.where(flat, tmax, np.minimum(tmax, np.maximum(t1, t2)))
+
+    return (near & (tmin <= tmax)).any(axis=1)
+
+
+def segmentHitsBox(x, y, rot, px, py, qx, qy):
+    rad = radians(rot)
+    (c, s) = (cos(rad), sin(rad))
+
+    u0 = (px - x) * c + (py - y) * s
+    v0 = (px - x) * s - (py - y) * c
+    u1 = (qx - x) * c + (qy - y) * s
+    v1 = (qx - x) * s - (qy - y) * c
+
+    (tmin, tmax) = (0.0, 1.0)
+    for p0, p1, h in [(u0, u1, HITBOX_WIDTH / 2), (v0, v1, HITBOX_LENGTH / 2)]:
+        d = p1 - p0
+        if d == 0:
+            if abs(p0) > h:
+                return False
+            continue
+        t1 = (-h - p0) / d
+        t2 = (h - p0) / d
+        tmin = max(tmin, min(t1, t2))
+        tmax = min(tmax, max(t1, t2))
+        if tmin > tmax:
+            return False
+    return True
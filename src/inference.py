@@ -0,0 +1,131 @@
+import neat
+import numpy as np
+from config.config_variables import *
+
+ACTIVATIONS = {
+    "sigmoid": lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    "tanh": lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    "sin": lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    "gauss": lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    "relu": lambda z: np.where(z > 0.0, z, 0.0),
+    "identity": lambda z: z,
+    "clamped": lambda z: np.clip(z, -1.0, 1.0),
+    "abs": np.abs,
+    "hat": lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    "square": lambda z: z**2,
+    "cube": lambda z: z**3,
+}
+
+
+class Layer:
+    def __init__(self, offset, width, size):
+        self.offset = offset
+        self.width = width
+        self.weights = np.zeros((size, width, offset))
+        self.bias = np.zeros((size, width))
+        self.response = np.zeros((size, width))
+        self.activation = np.full((size, width), "identity", dtype=object)
+
+    def compile(self):
+        self.groups = []
+        for name in set(self.activation.ravel()):
+            if name not in ACTIVATIONS:
+                raise ValueError(
+                    "Unsupported activation for batched inference: " + name
+                )
+            self.groups.append((ACTIVATIONS[name], self.activation == name))
+
+
+class PopulationNetwork:
+    def __init__(self, layers, outputs, num_inputs, size):
+        self.layers = layers
+        self.outputs = outputs
+        self.num_inputs = num_inputs
+        self.size = size
+        self.slots = layers[-1].offset + layers[-1].width if layers else num_inputs
+
+    @staticmethod
+    def create(genomes, config):
+        input_keys = config.genome_config.input_keys
+        output_keys = config.genome_config.output_keys
+
+        depths = []
+        for g in genomes:
+            net = neat.nn.FeedForwardNetwork.create(g, config)
+            depth = {k: 0 for k in input_keys}
+            nodes = []
+            for node, _, _, bias, response, links in net.node_evals:
+                gene = g.nodes[node]
+                if gene.aggregation != "sum":
+                    raise ValueError(
+                        "Unsupported aggregation for batched inference: "
+                        + gene.aggregation
+                    )
+                depth[node] = 1 + max([depth.get(i, 0) for (i, _) in links] + [0])
+                nodes.append((node, gene.activation, bias, response, links))
+            depths.append((depth, nodes))
+
+        num_layers = max([max(d.values()) for (d, _) in depths] + [0])
+        widths = [0] * (num_layers + 1)
+        for depth, nodes in depths:
+            counts = [0] * (num_layers + 1)
+            for node, *_ in nodes:
+                counts[depth[node]] += 1
+            widths = [max(w, c) for (w, c) in zip(widths, counts)]
+
+        size = len(genomes)
+        layers = []
+        offset = len(input_keys)
+        for d in range(1, num_layers + 1):
+            layers.append(Layer(offset, widths[d], size))
+            offset += widths[d]
+        zero = offset
+
+        outputs = np.full((size, len(output_keys)), zero, dtype=int)
+        for gi, (depth, nodes) in enumerate(depths):
+            slot = {k: i for (i, k) in enumerate(input_keys)}
+            used = [0] * (num_layers + 1)
+            for node, *_ in nodes:
+                layer = layers[depth[node] - 1]
+                slot[node] = layer.offset + used[depth[node]]
+                used[depth[node]] += 1
+
+            for node, activation, bias, response, links in nodes:
+                layer = layers[depth[node] - 1]
+                j = slot[node] - layer.offset
+                layer.bias[gi, j] = bias
+                layer.response[gi, j] = response
+                layer.activation[gi, j] = activation
+                for i, w in links:
+                    if i in slot and slot[i] < layer.offset:
+                        layer.weights[gi, j, slot[i]] += w
+
+            for k, key in enumerate(output_keys):
+                outputs[gi, k] = slot.get(key, zero)
+
+        for layer in layers:
+            layer.compile()
+        return PopulationNetwork(layers, outputs, len(input_keys), size)
+
+    def activate(self, inputs, idx=None):
+        if idx is None:
+            idx = np.arange(self.size)
+        full = len(idx) == self.size and np.array_equal(idx, np.arange(self.size))
+
+        values = np.zeros((len(idx), self.slots + 1))
+        values[:, : self.num_inputs] = inputs
+        for layer in self.layers:
+            weights = layer.weights if full else layer.weights[idx]
+            s = np.matmul(weights, values[:, : layer.offset, None])[:, :, 0]
+            bias = layer.bias if full else layer.bias[idx]
+            response = layer.response if full else layer.response[idx]
+            z = bias + response * s
+
+            out = np.empty_like(z)
+            for f, mask in layer.groups:
+                m = mask if full else mask[idx]
+                out[m] = f(z[m])
+            values[:, layer.offset : layer.offset + layer.width] = out
+
+        outputs = self.outputs if full else self.outputs[idx]
+        return np.take_along_axis(values, outputs, axis=1)
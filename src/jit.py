@@ -0,0 +1,126 @@
+import numpy as np
+from math import radians, degrees, sin, cos, atan2, sqrt
+from numba import njit
+from config.config_variables import *
+
+# scalar loops mirroring castRaysBatch, detectCollisionsBatch and
+# PopulationState.move; only imported through src.kernels
+
+
+@njit(cache=True)
+def castRaysBatch(segments, lines, x, y, rot):
+    sensors = np.full((len(x), 8), np.inf)
+    for i in range(len(x)):
+        (cx, cy) = (x[i], y[i])
+        for k in range(4):
+            omega = rot[i] + 45 * k
+            rad = radians(omega)
+            qx = cx + SENSOR_DISTANCE * sin(rad)
+            qy = cy + -SENSOR_DISTANCE * cos(rad)
+            a1 = cy - qy
+            b1 = qx - cx
+            c1 = cx * qy - qx * cy
+
+            for j in range(len(segments)):
+                (px, py, fx, fy) = (
+                    segments[j, 0],
+                    segments[j, 1],
+                    segments[j, 2],
+                    segments[j, 3],
+                )
+                if not py > cy - SENSOR_DISTANCE:
+                    continue
+                (a2, b2, c2) = (lines[j, 0], lines[j, 1], lines[j, 2])
+
+                if a1 == a2 and b1 == b2:
+                    ix = abs(px - fx)
+                    iy = abs(py - fy)
+                else:
+                    d = b1 * a2 - a1 * b2
+                    if d == 0:
+                        continue
+                    iy = (a1 * c2 - c1 * a2) / d
+                    ix = (c1 * b2 - b1 * c2) / d
+                    if (iy - py) * (iy - fy) > 0 or (ix - px) * (ix - fx) > 0:
+                        continue
+
+                dist = sqrt((cx - ix) ** 2 + (cy - iy) ** 2)
+                alpha = 90 - degrees(atan2(cy - iy, ix - cx))
+                front = (
+                    cos(alpha) * cos(omega) * 100 + sin(alpha) * sin(omega) * 100 > 0
+                )
+                slot = k if front else k + 4
+                if dist < sensors[i, slot]:
+                    sensors[i, slot] = dist
+    return np.minimum(sensors, SENSOR_DISTANCE)
+
+
+@njit(cache=True)
+def detectCollisionsBatch(segments, x, y, rot):
+    (hw, hl) = (HITBOX_WIDTH / 2, HITBOX_LENGTH / 2)
+    collided = np.zeros(len(x), dtype=np.bool_)
+    for i in range(len(x)):
+        rad = radians(rot[i])
+        (c, s) = (cos(rad), sin(rad))
+        for j in range(len(segments)):
+            dx0 = segments[j, 0] - x[i]
+            dy0 = segments[j, 1] - y[i]
+            dx1 = segments[j, 2] - x[i]
+            dy1 = segments[j, 3] - y[i]
+
+            u0 = dx0 * c + dy0 * s
+            v0 = dx0 * s - dy0 * c
+            u1 = dx1 * c + dy1 * s
+            v1 = dx1 * s - dy1 * c
+            if min(v0, v1) > hl or max(v0, v1) < -hl:
+                continue
+            if min(u0, u1) > hw or max(u0, u1) < -hw:
+                continue
+
+            (tmin, tmax) = (0.0, 1.0)
+            for axis in range(2):
+                (p, d, h) = (u0, u1 - u0, hw) if axis == 0 else (v0, v1 - v0, hl)
+                if d == 0:
+                    continue
+                t1 = (-h - p) / d
+                t2 = (h - p) / d
+                tmin = max(tmin, min(t1, t2))
+                tmax = min(tmax, max(t1, t2))
+            if tmin <= tmax:
+                collided[i] = True
+                break
+    return collided
+
+
+@njit(cache=True)
+def moveCars(x, y, rot, vel, acc, commands, idx, dt, max_vel):
+    for i in idx:
+        command = commands[i]
+        accelerate = (
+            command[ACC] > ACTIVATION_TRESHOLD and command[ACC] > command[BRAKE]
+        )
+        brake = command[BRAKE] > ACTIVATION_TRESHOLD and command[BRAKE] > command[ACC]
+        left = (
+            command[TURN_LEFT] > ACTIVATION_TRESHOLD
+            and command[TURN_LEFT] > command[TURN_RIGHT]
+        )
+        right = (
+            command[TURN_RIGHT] > ACTIVATION_TRESHOLD
+            and command[TURN_RIGHT] > command[TURN_LEFT]
+        )
+
+        if brake:
+            acc[i] = -BRAKE_STREGHT
+        elif accelerate:
+            acc[i] = ACC_STRENGHT
+        else:
+            acc[i] = FRICTION
+        if left:
+            rot[i] = rot[i] - TURN_VEL * dt
+        if right:
+            rot[i] = rot[i] + TURN_VEL * dt
+
+        vel[i] = min(max(vel[i] + acc[i] * dt, 0.0), max_vel)
+        omega = radians(rot[i])
+        x[i] += vel[i] * dt * sin(omega)
+        y[i] -= vel[i] * dt * cos(omega)
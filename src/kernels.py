@@ -0,0 +1,44 @@
+import importlib.util
+from config.config_variables import *
+
+BACKENDS = ("auto", "numpy", "numba")
+
+requested = None
+active = None
+
+
+def numbaAvailable():
+    return importlib.util.find_spec("numba") is not None
+
+
+def setBackend(name):
+    # "auto" takes the compiled kernels when numba is installed; numba itself
+    # is only imported on the first kernel call, so startup stays light
+    global requested, active
+    if name not in BACKENDS:
+        raise ValueError("Unknown kernel backend: " + str(name))
+    requested = name
+    if name == "numba" or (name == "auto" and numbaAvailable()):
+        active = "numba"
+    else:
+        active = "numpy"
+    return active
+
+
+def backend():
+    return active if active is not None else setBackend(KERNEL_BACKEND)
+
+
+def select(fallback, name):
+    # the compiled kernel called name when numba is active, else fallback
+    global active
+    if backend() == "numpy":
+        return fallback
+    try:
+        from . import jit
+    except ImportError:
+        if requested == "numba":
+            raise
+        active = "numpy"
+        return fallback
+    return getattr(jit, name)
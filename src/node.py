@@ -1,5 +1,6 @@
 import pygame as py
 from .car import decodeCommand
+from .sprites import getFont
 from config.config_variables import *
 
 
@@ -19,17 +20,23 @@ class Node:
         py.draw.circle(world.win, colorScheme[0], (self.x, self.y), NODE_RADIUS)
         py.draw.circle(world.win, colorScheme[1], (self.x, self.y), NODE_RADIUS - 2)
 
-        if self.type != MIDDLE:
-            text = NODE_FONT.render(self.label, 1, BLACK)
-            world.win.blit(
-                text,
-                (
-                    self.x
-                    + (self.type - 1)
-                    * ((text.get_width() if not self.type else 0) + NODE_RADIUS + 5),
-                    self.y - text.get_height() / 2,
-                ),
-            )
+    def renderLabel(self):
+        if self.type == MIDDLE:
+            return py.Surface((0, 0))
+        return getFont(NODE_FONT_SIZE).render(self.label, 1, BLACK)
+
+    def labelPos(self, text):
+        return (
+            self.x
+            + (self.type - 1)
+            * ((text.get_width() if not self.type else 0) + NODE_RADIUS + 5),
+            self.y - text.get_height() / 2,
+        )
+
+    def getRect(self):
+        return py.Rect(
+            self.x - NODE_RADIUS, self.y - NODE_RADIUS, 2 * NODE_RADIUS, 2 * NODE_RADIUS
+        )
 
     def getNodeColors(self, world):
         if self.type == INPUT:
@@ -56,13 +63,24 @@ class Connection:
         self.output = output
         self.wt = wt
 
-    def drawConnection(self, world):
+    def drawConnection(self, surface, offset=(0, 0)):
         color = GREEN if self.wt >= 0 else RED
         width = int(abs(self.wt * CONNECTION_WIDTH))
         py.draw.line(
-            world.win,
+            surface,
             color,
-            (self.input.x + NODE_RADIUS, self.input.y),
-            (self.output.x - NODE_RADIUS, self.output.y),
+            (self.input.x + NODE_RADIUS - offset[0], self.input.y - offset[1]),
+            (self.output.x - NODE_RADIUS - offset[0], self.output.y - offset[1]),
             width,
         )
+
+    def getRect(self):
+        width = int(abs(self.wt * CONNECTION_WIDTH))
+        (x0, y0) = (self.input.x + NODE_RADIUS, self.input.y)
+        (x1, y1) = (self.output.x - NODE_RADIUS, self.output.y)
+        return py.Rect(
+            min(x0, x1) - width,
+            min(y0, y1) - width,
+            abs(x1 - x0) + 2 * width + 1,
+            abs(y1 - y0) + 2 * width + 1,
+        )
@@ -0,0 +1,107 @@
+import time
+import multiprocessing as mp
+from random import Random
+from config.config_variables import *
+from .simulation import Simulation, budgetExhausted
+from .track import StoredTrack
+
+
+class ShardedEvaluator:
+    def __init__(
+        self, num_workers=None, rng=None, track_path=None, simulation_args=None
+    ):
+        self.num_workers = num_workers if num_workers else mp.cpu_count()
+        self.rng = rng if rng is not None else Random()
+        self.track_path = track_path
+        self.simulation_args = simulation_args if simulation_args is not None else {}
+        self.workers = []
+
+    def start(self, config):
+        for _ in range(self.num_workers):
+            (conn, child_conn) = mp.Pipe()
+            process = mp.Process(
+                target=worker,
+                args=(child_conn, config, self.simulation_args),
+                daemon=True,
+            )
+            process.start()
+            self.workers.append((process, conn))
+
+    def stop(self):
+        for process, conn in self.workers:
+            conn.send(("stop", None))
+            process.join()
+        self.workers = []
+
+    def evaluate(self, genomes, config):
+        if not self.workers:
+            self.start(config)
+
+        seed = self.rng.getrandbits(32)
+        shards = []
+        for (_, conn), shard in zip(
+            self.workers, shardGenomes(genomes, len(self.workers))
+        ):
+            if shard:
+                shard_genomes = [genomes[i][1] for i in shard]
+                conn.send(("start", (shard_genomes, seed, self.track_path)))
+                shards.append((conn, shard))
+
+        bestPos = None
+        bestFitness = 0
+        (t, start_time) = (0, time.perf_counter())
+        running = [conn for (conn, _) in shards]
+        while running and not budgetExhausted(t, start_time, bestFitness, config):
+            t += 1
+            for conn in running:
+                conn.send(("step", bestPos))
+            replies = [(conn, conn.recv()) for conn in running]
+
+            running = [conn for (conn, (count, _, _)) in replies if count > 0]
+            positions = zip(*[pos for (_, (_, pos, _)) in replies])
+            bestPos = [min(ps, key=lambda p: p[1]) for ps in positions]
+            bestFitness = max([bestFitness] + [f for (_, (_, _, f)) in replies])
+
+        for conn, shard in shards:
+            conn.send(("finish", None))
+            for i, fitness in zip(shard, conn.recv()):
+                genomes[i][1].fitness = fitness
+
+
+def shardGenomes(genomes, num_shards):
+    order = sorted(
+        range(len(genomes)),
+        key=lambda i: len(genomes[i][1].connections) + len(genomes[i][1].nodes),
+        reverse=True,
+    )
+    return [sorted(order[k::num_shards]) for k in range(num_shards)]
+
+
+def worker(conn, config, simulation_args):
+    simulation = Simulation(**simulation_args)
+    tracks = {}
+    while True:
+        (command, arg) = conn.recv()
+        if command == "start":
+            (genomes, seed, track_path) = arg
+            paths = track_path if isinstance(track_path, list) else [track_path]
+            for path in paths:
+                if path is not None and path not in tracks:
+                    tracks[path] = StoredTrack(path)
+            stored = [tracks.get(path) for path in paths]
+            simulation.reset(
+                [(g.key, g) for g in genomes],
+                config,
+                Random(seed),
+                stored if isinstance(track_path, list) else stored[0],
+            )
+        elif command == "step":
+            if simulation.t > 0:
+                simulation.advance(arg)
+            bestPos = simulation.step()
+            fitness = simulation.genomeFitness().max()
+            conn.send((simulation.pop.count(), bestPos, fitness))
+        elif command == "finish":
+            conn.send(simulation.genomeFitness().tolist())
+        elif command == "stop":
+            break
@@ -0,0 +1,100 @@
+import copy
+import numpy as np
+from random import random
+from config.config_variables import *
+from . import kernels
+
+
+class PopulationState:
+    def __init__(self, size):
+        self.size = size
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.rot = np.zeros(size)
+        self.vel = np.full(size, MAX_VEL / 2)
+        self.acc = np.zeros(size)
+        self.alive = np.ones(size, dtype=bool)
+        self.fitness = np.zeros(size)
+        self.progressY = np.zeros(size)
+        self.progressTime = np.zeros(size)
+        self.inputs = np.zeros((size, INPUT_NEURONS))
+        self.commands = np.zeros((size, OUTPUT_NEURONS))
+        self.sprite = np.array(
+            [int(random() * len(CAR_SPRITES)) for _ in range(size)], dtype=int
+        )
+
+    def view(self, count):
+        # the first count cars, sharing storage with this state
+        view = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                setattr(view, name, value[:count])
+        view.size = count
+        return view
+
+    def aliveIndices(self):
+        return np.flatnonzero(self.alive)
+
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def move(self, idx, t, dt=1.0):
+        timeBuffer = 500
+        if MAX_VEL_REDUCTION == 1 or t >= timeBuffer:
+            max_vel_local = MAX_VEL
+        else:
+            ratio = MAX_VEL_REDUCTION + (1 - MAX_VEL_REDUCTION) * (t / timeBuffer)
+            max_vel_local = MAX_VEL * ratio
+
+        kernel = kernels.select(None, "moveCars")
+        if kernel is not None:
+            kernel(
+                self.x,
+                self.y,
+                self.rot,
+                self.vel,
+                self.acc,
+                self.commands,
+                idx,
+                float(dt),
+                float(max_vel_local),
+            )
+            return
+
+        (acc, brake, left, right) = decodeCommands(self.commands[idx])
+
+        self.acc[idx] = np.where(
+            brake, -BRAKE_STREGHT, np.where(acc, ACC_STRENGHT, FRICTION)
+        )
+        rot = self.rot[idx]
+        rot = np.where(left, rot - TURN_VEL * dt, rot)
+        rot = np.where(right, rot + TURN_VEL * dt, rot)
+        self.rot[idx] = rot
+
+        vel = np.clip(self.vel[idx] + self.acc[idx] * dt, 0, max_vel_local)
+        self.vel[idx] = vel
+        omega = np.radians(rot)
+        self.x[idx] += vel * dt * np.sin(omega)
+        self.y[idx] -= vel * dt * np.cos(omega)
+
+    def stagnant(self, idx, t):
+        # a car must gain STAGNATION_DISTANCE within every STAGNATION_TICKS window
+        progressed = self.y[idx] < self.progressY[idx] - STAGNATION_DISTANCE
+        moved = idx[progressed]
+        self.progressY[moved] = self.y[moved]
+        self.progressTime[moved] = t
+        return ~progressed & (t - self.progressTime[idx] > STAGNATION_TICKS)
+
+    def kill(self, idx):
+        self.fitness[idx] -= 1
+        self.alive[idx] = False
+
+
+def decodeCommands(commands):
+    active = commands > ACTIVATION_TRESHOLD
+    return (
+        active[:, ACC] & (commands[:, ACC] > commands[:, BRAKE]),
+        active[:, BRAKE] & (commands[:, BRAKE] > commands[:, ACC]),
+        active[:, TURN_LEFT] & (commands[:, TURN_LEFT] > commands[:, TURN_RIGHT]),
+        active[:, TURN_RIGHT] & (commands[:, TURN_RIGHT] > commands[:, TURN_LEFT]),
+    )
@@ -0,0 +1,65 @@
+import json
+import time
+from config.config_variables import *
+
+PHASES = ["sensors", "activate", "move", "collision", "road", "draw"]
+
+
+class NullProfiler:
+    def clock(self):
+        return 0
+
+    def phase(self, name, start):
+        pass
+
+    def count(self, name, n):
+        pass
+
+    def flush(self, generation):
+        return None
+
+
+class PhaseProfiler:
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self.reset()
+
+    def reset(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counters = {
+            "ticks": 0,
+            "alive": 0,
+            "sensor_calls": 0,
+            "segments_scanned": 0,
+        }
+
+    def clock(self):
+        return time.perf_counter()
+
+    def phase(self, name, start):
+        self.times[name] += time.perf_counter() - start
+
+    def count(self, name, n):
+        self.counters[name] += n
+
+    def flush(self, generation):
+        ticks = max(self.counters["ticks"], 1)
+        summary = {
+            "Generation": generation,
+            "Ticks": self.counters["ticks"],
+            "Cars Alive Per Tick": self.counters["alive"] / ticks,
+            "Segments Per Sensor Call": self.counters["segments_scanned"]
+            / max(self.counters["sensor_calls"], 1),
+        }
+        for name in PHASES:
+            summary[name.capitalize() + " ms/tick"] = self.times[name] * 1000 / ticks
+
+        if self.log_path is not None:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        self.reset()
+        return summary
+
+
+def createProfiler(log_path=None):
+    return PhaseProfiler(log_path) if PROFILE else NullProfiler()
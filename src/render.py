@@ -0,0 +1,165 @@
+import io
+import time
+import numpy as np
+import pygame as py
+from config.config_variables import *
+from .population import decodeCommands
+from .sprites import blitSprite, getAtlas, getFont
+from .NNdraw import NN
+
+
+def drawScene(win, world, road, pop, gen):
+    drawRoad(win, world, road)
+    drawCars(win, world, pop)
+    if CAR_DBG:
+        drawSensors(win, world, pop)
+
+    font = getFont(STAT_FONT_SIZE)
+    text = font.render("Best Car Score: " + str(int(world.getScore())), 1, BLACK)
+    win.blit(text, (world.win_width - text.get_width() - 10, 10))
+    text = font.render("Gen: " + str(gen), 1, BLACK)
+    win.blit(text, (world.win_width - text.get_width() - 10, 50))
+
+    if world.bestGenome is not None:
+        if world.bestNN is None or world.bestNN.genome is not world.bestGenome:
+            world.bestNN = NN(world.config, world.bestGenome, (90, 210))
+        world.bestNN.draw(world)
+
+
+def drawRoad(win, world, road):
+    for points in road.visiblePolylines(world):
+        screen_points = world.toScreen(points).tolist()
+        if ROAD_DBG:
+            for p in screen_points:
+                py.draw.circle(win, BLUE, p, 2)
+        else:
+            py.draw.lines(win, BLACK, False, screen_points, 4)
+
+
+def drawSensors(win, world, pop):
+    # the four sensor lines of every car and the border hits in its inputs
+    idx = pop.aliveIndices()
+    omega = np.radians(pop.rot[idx, None] + 45 * np.arange(8))
+    (sin, cos) = (np.sin(omega), np.cos(omega))
+    centers = np.stack([pop.x[idx], pop.y[idx]], axis=1)[:, None, :]
+
+    reach = SENSOR_DISTANCE * np.stack([sin[:, :4], -cos[:, :4]], axis=2)
+    starts = world.toScreen(centers + reach).tolist()
+    ends = world.toScreen(centers - reach).tolist()
+    for car_starts, car_ends in zip(starts, ends):
+        for start, end in zip(car_starts, car_ends):
+            py.draw.line(win, GREEN, start, end, 2)
+
+    dist = (1 - pop.inputs[idx, :8]) * SENSOR_DISTANCE
+    hits = centers + dist[:, :, None] * np.stack([sin, -cos], axis=2)
+    for point in world.toScreen(hits[dist < SENSOR_DISTANCE]).tolist():
+        py.draw.circle(win, RED, point, 6)
+
+
+def drawCars(win, world, pop):
+    braking = decodeCommands(pop.commands)[BRAKE]
+    for i in pop.aliveIndices():
+        screen_position = world.getScreenCoords(pop.x[i], pop.y[i])
+        atlas = getAtlas(CAR_SPRITES[pop.sprite[i]])
+        blitSprite(win, atlas, pop.rot[i], screen_position)
+        if braking[i]:
+            blitSprite(win, getAtlas(BRAKE_SPRITE), pop.rot[i], screen_position)
+
+
+class WindowBackend:
+    def __init__(self, fps=FPS):
+        self.fps = fps
+        self.win = None
+        self.clock = None
+
+    def open(self, width, height):
+        self.win = py.display.set_mode((width, height))
+        self.bg = py.Surface((width, height))
+        self.bg.fill(GRAY)
+        self.win.blit(self.bg, (0, 0))
+        self.clock = py.time.Clock()
+        return self.win
+
+    def poll(self):
+        for event in py.event.get():
+            if event.type == py.QUIT:
+                py.quit()
+                quit()
+
+    def render(self, world, road, pop, gen):
+        if self.fps:
+            self.clock.tick(self.fps)
+
+        drawScene(self.win, world, road, pop, gen)
+        py.display.update()
+        self.win.blit(self.bg, (0, 0))
+        return None
+
+    def close(self):
+        pass
+
+
+class CaptureBackend:
+    def __init__(self):
+        self.win = None
+
+    def open(self, width, height):
+        self.win = py.Surface((width, height))
+        self.bg = py.Surface((width, height))
+        self.bg.fill(GRAY)
+        self.win.blit(self.bg, (0, 0))
+        return self.win
+
+    def poll(self):
+        pass
+
+    def render(self, world, road, pop, gen):
+        drawScene(self.win, world, road, pop, gen)
+        frame = py.surfarray.array3d(self.win)
+        self.win.blit(self.bg, (0, 0))
+        return frame
+
+    def close(self):
+        pass
+
+
+class StreamBackend:
+    def __init__(self, width=STREAM_WIDTH, fps=STREAM_FPS):
+        self.width = width
+        self.fps = fps
+        self.win = None
+        self.last_frame = None
+
+    def open(self, width, height):
+        self.win = py.Surface((width, height))
+        self.bg = py.Surface((width, height))
+        self.bg.fill(GRAY)
+        self.win.blit(self.bg, (0, 0))
+        size = (self.width, round(height * self.width / width))
+        self.frame = py.Surface(size)
+        return self.win
+
+    def poll(self):
+        pass
+
+    def render(self, world, road, pop, gen):
+        # frames above the display rate are dropped before anything is drawn
+        now = time.perf_counter()
+        if (
+            self.fps
+            and self.last_frame is not None
+            and now - self.last_frame < 1 / self.fps
+        ):
+            return None
+        self.last_frame = now
+
+        drawScene(self.win, world, road, pop, gen)
+        py.transform.smoothscale(self.win, self.frame.get_size(), self.frame)
+        self.win.blit(self.bg, (0, 0))
+
+        buffer = io.BytesIO()
+        py.image.save(self.frame, buffer, "frame.jpg")
+        return buffer.getvalue()
+
+    def close(self):
+        pass
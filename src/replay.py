@@ -0,0 +1,193 @@
+import os
+import pickle
+import argparse
+import numpy as np
+from config.config_variables import *
+from .world import World
+from .population import decodeCommands
+
+
+class NullRecorder:
+    def start(self, simulation):
+        pass
+
+    def record(self, simulation):
+        pass
+
+    def finish(self, simulation, gen):
+        return None
+
+
+class TrajectoryRecorder:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def start(self, simulation):
+        road = simulation.road
+        self.borders = [road.borders[:, : road.next_point].astype(np.float32)]
+        self.segmentsSeen = road.segmentCount
+        self.ticks = {
+            name: []
+            for name in [
+                "x",
+                "y",
+                "rot",
+                "alive",
+                "braking",
+                "best_pos",
+                "score",
+                "best_inputs",
+                "best_commands",
+                "best_key",
+            ]
+        }
+        self.bestGenomes = {}
+
+    def record(self, simulation):
+        (world, road, pop) = (simulation.world, simulation.road, simulation.view)
+        cap = NUM_POINTS * road.num_ctrl_points
+        for k in range(self.segmentsSeen, road.segmentCount):
+            start = (road.next_point - NUM_POINTS * (road.segmentCount - k)) % cap
+            self.borders.append(
+                road.borders[:, start : start + NUM_POINTS].astype(np.float32)
+            )
+        self.segmentsSeen = road.segmentCount
+
+        best = world.bestGenome
+        if best is not None:
+            self.bestGenomes.setdefault(best.key, best)
+
+        ticks = self.ticks
+        ticks["x"].append(pop.x.astype(np.float32))
+        ticks["y"].append(pop.y.astype(np.float32))
+        ticks["rot"].append(pop.rot.astype(np.float32))
+        ticks["alive"].append(pop.alive.copy())
+        ticks["braking"].append(decodeCommands(pop.commands)[BRAKE])
+        ticks["best_pos"].append(np.array(world.getBestCarPos(), dtype=np.float32))
+        ticks["score"].append(np.float32(world.getScore()))
+        ticks["best_inputs"].append(np.asarray(world.bestInputs, dtype=np.float32))
+        ticks["best_commands"].append(np.asarray(world.bestCommands, dtype=np.float32))
+        ticks["best_key"].append(-1 if best is None else best.key)
+
+    def finish(self, simulation, gen):
+        # the tick that ends a generation breaks out before record is called
+        if simulation.t > 0:
+            self.record(simulation)
+        if not self.ticks["x"]:
+            return None
+
+        arrays = {name: np.stack(values) for (name, values) in self.ticks.items()}
+        arrays["best_key"] = arrays["best_key"].astype(np.int64)
+        arrays["borders"] = np.concatenate(self.borders, axis=1)
+        arrays["sprite"] = simulation.view.sprite.astype(np.uint8)
+        arrays["gen"] = np.int64(gen)
+        arrays["genomes"] = np.frombuffer(
+            pickle.dumps(self.bestGenomes, protocol=pickle.HIGHEST_PROTOCOL),
+            dtype=np.uint8,
+        )
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, "gen_" + str(gen) + ".npz")
+        np.savez_compressed(path, **arrays)
+        return path
+
+
+class RecordedRoad:
+    def __init__(self, borders):
+        self.borders = borders
+
+    def visiblePolylines(self, world):
+        top = world.getBestCarPos()[1] - world.initialPos[1]
+        polylines = []
+        for side in self.borders:
+            visible = (side[:, 1] >= top - INDEX_BAND) & (
+                side[:, 1] <= top + world.win_height + INDEX_BAND
+            )
+            rows = np.flatnonzero(visible)
+            for run in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1):
+                if len(run) > 1:
+                    polylines.append(side[run].astype(float))
+        return polylines
+
+
+class RecordedPopulation:
+    def __init__(self, sprite):
+        self.sprite = sprite
+        self.commands = np.zeros((len(sprite), OUTPUT_NEURONS))
+
+    def show(self, x, y, rot, alive, braking):
+        (self.x, self.y, self.rot, self.alive) = (x, y, rot, alive)
+        self.commands[:, BRAKE] = braking
+
+    def aliveIndices(self):
+        return np.flatnonzero(self.alive)
+
+
+class Replay:
+    def __init__(self, path, config=None):
+        data = np.load(path)
+        self.data = {name: data[name] for name in data.files}
+        self.gen = int(self.data["gen"])
+        self.config = config
+        self.genomes = pickle.loads(self.data["genomes"].tobytes())
+        self.road = RecordedRoad(self.data["borders"])
+        self.pop = RecordedPopulation(self.data["sprite"].astype(int))
+
+    def __len__(self):
+        return len(self.data["x"])
+
+    def show(self, world, t):
+        d = self.data
+        self.pop.show(d["x"][t], d["y"][t], d["rot"][t], d["alive"][t], d["braking"][t])
+        world.updateBestCarPos(tuple(d["best_pos"][t]))
+        world.updateScore(float(d["score"][t]))
+        world.bestInputs = d["best_inputs"][t]
+        world.bestCommands = d["best_commands"][t]
+        if self.config is not None:
+            world.config = self.config
+            world.bestGenome = self.genomes.get(int(d["best_key"][t]))
+
+    def play(self, backend, speed=1.0, start=0):
+        # checked here rather than in the generator, so the error is immediate
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        return self.frames(backend, speed, start)
+
+    def frames(self, backend, speed, start):
+        win = backend.open(WIN_WIDTH, WIN_HEIGHT)
+        world = World(STARTING_POS, WIN_WIDTH, WIN_HEIGHT, win)
+
+        t = float(start)
+        while t < len(self):
+            backend.poll()
+            self.show(world, int(t))
+            frame = backend.render(world, self.road, self.pop, self.gen)
+            if frame is not None:
+                yield frame
+            t += speed
+        backend.close()
+
+
+if __name__ == "__main__":
+    import neat
+    from .backend import createBackend
+
+    parser = argparse.ArgumentParser(description="Replay a recorded generation")
+    parser.add_argument("path", help="gen_<n>.npz written by TrajectoryRecorder")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="recorded ticks per frame"
+    )
+    parser.add_argument("--start", type=int, default=0, help="first tick to show")
+    parser.add_argument("--backend", default="window")
+    args = parser.parse_args()
+
+    config = neat.config.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        os.path.join("config", "config_file.txt"),
+    )
+    replay = Replay(args.path, config)
+    for _ in replay.play(createBackend(args.backend), args.speed, args.start):
+        pass
@@ -1,39 +1,42 @@
 from config.config_variables import *
-import pygame as py
 import numpy as np
-from scipy import interpolate
 from math import *
 from .vect2d import *
-from random import random, seed
+from .track import TrackGenerator, offsetBorders
 
 
 class Road:
-    def __init__(self, world):
+    def __init__(self, world, rng=None, track=None):
         self.num_ctrl_points = (int)((world.win_height + SAFE_SPACE) / SPACING) + 2
+        cap = NUM_POINTS * self.num_ctrl_points
 
         self.last_ctrl_point = 0
         self.ctrl_points = []
-        self.centerPoints = []
-        self.pointsLeft = []
-        self.pointsRight = []
+        self.centerPoints = np.full((cap, 2), 1000.0)
+        self.borders = np.full((2, cap, 2), 1000.0)
+        self.pointsLeft = self.borders[0]
+        self.pointsRight = self.borders[1]
+        self.segments = np.full((2 * cap, 4), 1000.0)
+        self.lines = np.zeros((2 * cap, 3))
+        self.index = SegmentIndex()
+        self.generator = TrackGenerator(rng)
+        self.track = track
+        self.segmentCount = 0
 
         for i in range(self.num_ctrl_points):
             self.ctrl_points.append(vect2d())
 
-        for i in range(NUM_POINTS * self.num_ctrl_points):
-            self.pointsLeft.append(vect2d(1000, 1000))
-            self.pointsRight.append(vect2d(1000, 1000))
-            self.centerPoints.append(vect2d(1000, 1000))
-
         self.ctrl_points[0].co(0, SPACING)
         self.ctrl_points[1].co(0, 0)
-        for i in range(NUM_POINTS):
-            x = self.ctrl_points[0].x
-            y = self.ctrl_points[0].y - SPACING / NUM_POINTS * i
-            self.centerPoints[i].co(x, y)
-            self.pointsLeft[i].co(x - ROAD_WIDTH / 2, y)
-            self.pointsRight[i].co(x + ROAD_WIDTH / 2, y)
+        y = self.ctrl_points[0].y - SPACING / NUM_POINTS * np.arange(NUM_POINTS)
+        self.centerPoints[:NUM_POINTS, 0] = self.ctrl_points[0].x
+        self.centerPoints[:NUM_POINTS, 1] = y
+        self.pointsLeft[:NUM_POINTS, 0] = self.ctrl_points[0].x - ROAD_WIDTH / 2
+        self.pointsLeft[:NUM_POINTS, 1] = y
+        self.pointsRight[:NUM_POINTS, 0] = self.ctrl_points[0].x + ROAD_WIDTH / 2
+        self.pointsRight[:NUM_POINTS, 1] = y
         self.next_point = NUM_POINTS
+        self.updateSegments(1, NUM_POINTS - 1)
 
         for i in range(self.num_ctrl_points - 2):
             self.createSegment(i + 1)
@@ -41,54 +44,95 @@ class Road:
         self.last_ctrl_point = self.num_ctrl_points - 1
         self.bottomPointIndex = 0
 
-    def calcBorders(self, i):
-        prev_index = getPoint(i - 1, self.num_ctrl_points * NUM_POINTS)
-        center = self.centerPoints[i]
-        prev = self.centerPoints[prev_index]
-        angle = atan2(center.x - prev.x, prev.y - center.y)
-
-        x = ROAD_WIDTH / 2 * cos(angle)
-        y = ROAD_WIDTH / 2 * sin(angle)
-        self.pointsLeft[i].x = center.x - x
-        self.pointsLeft[i].y = (
-            center.y - y
-            if not center.y - y >= self.pointsLeft[prev_index].y
-            else self.pointsLeft[prev_index].y
+    def updateSegments(self, start, count):
+        cap = NUM_POINTS * self.num_ctrl_points
+        rows = (start - 1 + np.arange(count + 1)) % cap
+        for side in range(2):
+            p = self.borders[side][rows]
+            q = self.borders[side][(rows + 1) % cap]
+            self.segments[side * cap + rows] = np.hstack([p, q])
+            self.lines[side * cap + rows] = np.column_stack(
+                [
+                    p[:, 1] - q[:, 1],
+                    q[:, 0] - p[:, 0],
+                    p[:, 0] * q[:, 1] - q[:, 0] * p[:, 1],
+                ]
+            )
+
+            for k, i in enumerate(rows):
+                self.index.remove(side * cap + i)
+                if k < count:
+                    self.index.insert(side * cap + i, p[k, 1], q[k, 1])
+
+    def segmentsInRange(self, y0, y1):
+        return self.index.query(y0, y1)
+
+    def segmentsNear(self, x, y, r):
+        ids = self.index.query(y - r, y + r)
+        segments = self.segments[ids]
+        near = (np.minimum(segments[:, 0], segments[:, 2]) <= x + r) & (
+            np.maximum(segments[:, 0], segments[:, 2]) >= x - r
         )
-        self.pointsRight[i].x = center.x + x
-        self.pointsRight[i].y = (
-            center.y + y
-            if not center.y + y >= self.pointsRight[prev_index].y
-            else self.pointsRight[prev_index].y
+        return ids[near]
+
+    def visibleSegments(self, world):
+        top = world.getBestCarPos()[1] - world.initialPos[1]
+        return self.index.query(top, top + world.win_height)
+
+    def visiblePolylines(self, world):
+        # consecutive visible rows of one border chain into a single polyline
+        cap = NUM_POINTS * self.num_ctrl_points
+        ids = self.visibleSegments(world)
+        polylines = []
+        for side in range(2):
+            rows = ids[(ids >= side * cap) & (ids < (side + 1) * cap)]
+            for run in np.split(rows, np.flatnonzero(np.diff(rows) != 1) + 1):
+                if len(run) > 0:
+                    segments = self.segments[run]
+                    polylines.append(np.vstack([segments[:, :2], segments[-1:, 2:]]))
+        return polylines
+
+    def getSegments(self, ids):
+        return self.segments[ids]
+
+    def getLines(self, ids):
+        return self.lines[ids]
+
+    def calcBorders(self, start, count):
+        prev_index = getPoint(start - 1, NUM_POINTS * self.num_ctrl_points)
+        (left, right) = offsetBorders(
+            self.centerPoints[start : start + count],
+            self.centerPoints[prev_index],
+            self.pointsLeft[prev_index, 1],
+            self.pointsRight[prev_index, 1],
         )
+        self.pointsLeft[start : start + count] = left
+        self.pointsRight[start : start + count] = right
 
     def createSegment(self, index):
+        start = self.next_point
         p1 = self.ctrl_points[getPoint(index, self.num_ctrl_points)]
         p2 = self.ctrl_points[getPoint(index + 1, self.num_ctrl_points)]
-        seed()
-        p2.co(p1.x + (random() - 0.5) * MAX_DEVIATION, p1.y - SPACING)
-        p2.angle = MAX_ANGLE * (random() - 0.5)
-
-        y_tmp = []
-        for i in range(NUM_POINTS):
-            y_tmp.append(p2.y + SPACING / NUM_POINTS * i)
-
-        ny = np.array([p2.y, p1.y])
-        nx = np.array([p2.x, p1.x])
-        cs = interpolate.CubicSpline(
-            ny, nx, axis=0, bc_type=((1, p2.angle), (1, p1.angle))
-        )
-        res = cs(y_tmp)
-
-        for i in range(NUM_POINTS):
-            self.centerPoints[self.next_point].x = res[NUM_POINTS - i - 1]
-            self.centerPoints[self.next_point].y = y_tmp[NUM_POINTS - i - 1]
-            self.calcBorders(self.next_point)
-
-            self.next_point = getPoint(
-                self.next_point + 1, NUM_POINTS * self.num_ctrl_points
+        self.segmentCount += 1
+
+        if self.track is not None and self.segmentCount <= self.track.numSegments:
+            self.track.loadSegment(
+                self.segmentCount,
+                p2,
+                self.centerPoints[start : start + NUM_POINTS],
+                self.borders[:, start : start + NUM_POINTS],
             )
-
+        else:
+            self.generator.nextCtrlPoint(p1, p2)
+            (x, y) = self.generator.segment(p1, p2)
+            self.centerPoints[start : start + NUM_POINTS, 0] = x
+            self.centerPoints[start : start + NUM_POINTS, 1] = y
+            self.calcBorders(start, NUM_POINTS)
+        self.updateSegments(start, NUM_POINTS)
+
+        self.next_point = getPoint(
+            start + NUM_POINTS, NUM_POINTS * self.num_ctrl_points
+        )
         self.last_ctrl_point = getPoint(self.last_ctrl_point + 1, self.num_ctrl_points)
         self.bottomPointIndex = self.next_point
 
@@ -99,46 +143,34 @@ class Road:
         ):
             self.createSegment(self.last_ctrl_point)
 
-    def draw(self, world):
-        if ROAD_DBG:
-            for i in range(len(self.pointsLeft)):
-                py.draw.circle(
-                    world.win,
-                    BLUE,
-                    world.getScreenCoords(self.pointsLeft[i].x, self.pointsLeft[i].y),
-                    2,
-                )
-                py.draw.circle(
-                    world.win,
-                    BLUE,
-                    world.getScreenCoords(self.pointsRight[i].x, self.pointsRight[i].y),
-                    2,
-                )
-        else:
-            for i in range(len(self.pointsLeft)):
-                next_index = getPoint(i + 1, NUM_POINTS * self.num_ctrl_points)
-
-                p = self.pointsLeft[i]
-                f = self.pointsLeft[next_index]
-                if p.y >= f.y:
-                    py.draw.line(
-                        world.win,
-                        BLACK,
-                        world.getScreenCoords(p.x, p.y),
-                        world.getScreenCoords(f.x, f.y),
-                        4,
-                    )
-
-                p = self.pointsRight[i]
-                f = self.pointsRight[next_index]
-                if p.y >= f.y:
-                    py.draw.line(
-                        world.win,
-                        BLACK,
-                        world.getScreenCoords(p.x, p.y),
-                        world.getScreenCoords(f.x, f.y),
-                        4,
-                    )
+
+class SegmentIndex:
+    def __init__(self, band=INDEX_BAND):
+        self.band = band
+        self.bands = {}
+        self.segmentBands = {}
+
+    def insert(self, id, y0, y1):
+        b0 = floor(min(y0, y1) / self.band)
+        b1 = floor(max(y0, y1) / self.band)
+        for b in range(b0, b1 + 1):
+            self.bands.setdefault(b, set()).add(id)
+        self.segmentBands[id] = (b0, b1)
+
+    def remove(self, id):
+        if id not in self.segmentBands:
+            return
+        (b0, b1) = self.segmentBands.pop(id)
+        for b in range(b0, b1 + 1):
+            self.bands[b].discard(id)
+            if not self.bands[b]:
+                del self.bands[b]
+
+    def query(self, y0, y1):
+        ids = set()
+        for b in range(floor(y0 / self.band), floor(y1 / self.band) + 1):
+            ids.update(self.bands.get(b, ()))
+        return np.array(sorted(ids), dtype=int)
 
 
 def getPoint(i, cap):
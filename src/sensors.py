@@ -0,0 +1,68 @@
+import numpy as np
+from config.config_variables import *
+from . import kernels
+
+
+def castRays(segments, lines, x, y, rot):
+    sensors = np.full((len(x), 8), float(SENSOR_DISTANCE))
+    if len(x) == 0:
+        return sensors
+
+    keep = (segments[:, 1] > y.min() - SENSOR_DISTANCE) & (
+        np.minimum(segments[:, 1], segments[:, 3]) < y.max() + SENSOR_DISTANCE
+    )
+    (segments, lines) = (segments[keep], lines[keep])
+
+    if len(segments) > 0:
+        batch = kernels.select(castRaysBatch, "castRaysBatch")
+        for s in range(0, len(x), SENSOR_BATCH):
+            e = s + SENSOR_BATCH
+            sensors[s:e] = batch(segments, lines, x[s:e], y[s:e], rot[s:e])
+
+    return 1 - sensors / SENSOR_DISTANCE
+
+
+def castRaysBatch(segments, lines, x, y, rot):
+    cx = x[:, None, None]
+    cy = y[:, None, None]
+    omega = rot[:, None, None] + 45 * np.arange(4)[None, :, None]
+
+    rad = np.radians(omega)
+    qx = cx + SENSOR_DISTANCE * np.sin(rad)
+    qy = cy + -SENSOR_DISTANCE * np.cos(rad)
+    a1 = cy - qy
+    b1 = qx - cx
+    c1 = cx * qy - qx * cy
+
+    px = segments[None, None, :, 0]
+    py = segments[None, None, :, 1]
+    fx = segments[None, None, :, 2]
+    fy = segments[None, None, :, 3]
+    a2 = lines[None, None, :, 0]
+    b2 = lines[None, None, :, 1]
+    c2 = lines[None, None, :, 2]
+
+    d = b1 * a2 - a1 * b2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iy = (a1 * c2 - c1 * a2) / d
+        ix = (c1 * b2 - b1 * c2) / d
+    hit = (d != 0) & ~((iy - py) * (iy - fy) > 0) & ~((ix - px) * (ix - fx) > 0)
+
+    same = (a1 == a2) & (b1 == b2)
+    if same.any():
+        ix = np.where(same, np.abs(px - fx), ix)
+        iy = np.where(same, np.abs(py - fy), iy)
+        hit = hit | same
+
+    hit &= py > cy - SENSOR_DISTANCE
+
+    dist = np.where(hit, np.sqrt((cx - ix) ** 2 + (cy - iy) ** 2), np.inf)
+    alpha = 90 - np.degrees(np.arctan2(cy - iy, ix - cx))
+    front = (
+        np.cos(alpha) * np.cos(omega) * 100 + np.sin(alpha) * np.sin(omega) * 100 > 0
+    )
+
+    sensors = np.empty((len(x), 8))
+    sensors[:, :4] = np.where(front, dist, np.inf).min(axis=2)
+    sensors[:, 4:] = np.where(front, np.inf, dist).min(axis=2)
+    return np.minimum(sensors, SENSOR_DISTANCE)
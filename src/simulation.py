@@ -0,0 +1,246 @@
+import time
+import numpy as np
+from config.config_variables import *
+from .road import Road
+from .world import World
+from .population import PopulationState
+from .inference import PopulationNetwork
+from .backend import NullBackend
+from .profiler import NullProfiler
+from .replay import NullRecorder
+from .sensors import castRays
+from .collision import HITBOX_RADIUS, detectCollisions
+
+AGGREGATES = {"mean": np.mean, "min": np.min}
+
+
+class Simulation:
+    def __init__(
+        self,
+        backend=None,
+        rng=None,
+        track=None,
+        render_every=RENDER_EVERY,
+        profiler=None,
+        recorder=None,
+        decision_interval=DECISION_INTERVAL,
+        dt=TIMESTEP,
+        num_tracks=NUM_TRACKS,
+        aggregate=TRACK_AGGREGATE,
+    ):
+        if aggregate not in AGGREGATES:
+            raise ValueError("Unknown track aggregate: " + str(aggregate))
+        if num_tracks < 1:
+            raise ValueError("num_tracks must be at least 1")
+        if render_every < 1:
+            raise ValueError("render_every must be at least 1")
+        if decision_interval < 1:
+            raise ValueError("decision_interval must be at least 1")
+        if dt <= 0:
+            raise ValueError("dt must be positive")
+
+        self.backend = backend if backend is not None else NullBackend()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.recorder = recorder if recorder is not None else NullRecorder()
+        self.render_every = render_every
+        self.decision_interval = decision_interval
+        self.dt = dt
+        self.num_tracks = num_tracks
+        self.aggregate = aggregate
+        self.rng = rng
+        self.track = track
+
+    def reset(self, genomes, config, rng=None, track=None):
+        self.t = 0
+        self.startTime = time.perf_counter()
+        self.config = config
+        self.genomes = []
+
+        for _, g in genomes:
+            g.fitness = 0
+            self.genomes.append(g)
+        self.size = len(self.genomes)
+
+        # a list of stored tracks sets the track count; without stored tracks
+        # num_tracks roads are generated from the shared rng
+        tracks = track if track is not None else self.track
+        if tracks is None:
+            tracks = [None] * self.num_tracks
+        elif not isinstance(tracks, list):
+            if self.num_tracks > 1:
+                raise ValueError("One stored track cannot be driven as several tracks")
+            tracks = [tracks]
+        rng = rng if rng is not None else self.rng
+
+        # car c drives genome c % size on track c // size
+        win = self.backend.open(WIN_WIDTH, WIN_HEIGHT)
+        self.worlds = []
+        self.roads = []
+        for stored in tracks:
+            world = World(STARTING_POS, WIN_WIDTH, WIN_HEIGHT, win)
+            world.config = config
+            self.worlds.append(world)
+            self.roads.append(Road(world, rng, stored))
+        (self.world, self.road) = (self.worlds[0], self.roads[0])
+
+        self.pop = PopulationState(self.size * len(tracks))
+        self.trackOf = np.repeat(np.arange(len(tracks)), self.size)
+        self.genomeOf = np.tile(np.arange(self.size), len(tracks))
+        self.view = self.pop.view(self.size) if len(tracks) > 1 else self.pop
+        self.nets = PopulationNetwork.create(self.genomes, config)
+
+    def step(self):
+        (pop, prof) = (self.pop, self.profiler)
+        self.t += 1
+        simTime = self.t * self.dt
+        for world in self.worlds:
+            world.updateScore(0)
+
+        idx = pop.aliveIndices()
+        prof.count("ticks", 1)
+        prof.count("alive", len(idx))
+        tracks = [
+            (k, np.flatnonzero(self.trackOf[idx] == k)) for k in range(len(self.roads))
+        ]
+
+        # sense and decide every decision_interval ticks, holding the commands between
+        if (self.t - 1) % self.decision_interval == 0:
+            start = prof.clock()
+            for k, rows in tracks:
+                if len(rows) == 0:
+                    continue
+                (road, cars) = (self.roads[k], idx[rows])
+                (x, y) = (pop.x[cars], pop.y[cars])
+                ids = road.segmentsInRange(
+                    y.min() - SENSOR_DISTANCE, y.max() + SENSOR_DISTANCE
+                )
+                pop.inputs[cars, :8] = castRays(
+                    road.getSegments(ids), road.getLines(ids), x, y, pop.rot[cars]
+                )
+                prof.count("sensor_calls", 1)
+                prof.count("segments_scanned", len(ids))
+            pop.inputs[idx, 8] = pop.vel[idx] / MAX_VEL
+            prof.phase("sensors", start)
+
+            start = prof.clock()
+            pop.commands[idx] = self.nets.activate(pop.inputs[idx], self.genomeOf[idx])
+            prof.phase("activate", start)
+
+        start = prof.clock()
+        y_old = pop.y[idx]
+        pop.move(idx, simTime, self.dt)
+        (x, y) = (pop.x[idx], pop.y[idx])
+        prof.phase("move", start)
+
+        start = prof.clock()
+        if simTime > 10:
+            collided = np.zeros(len(idx), dtype=bool)
+            for k, rows in tracks:
+                if len(rows) == 0:
+                    continue
+                (road, cars) = (self.roads[k], idx[rows])
+                ids = road.segmentsInRange(
+                    y[rows].min() - HITBOX_RADIUS, y[rows].max() + HITBOX_RADIUS
+                )
+                collided[rows] = detectCollisions(
+                    road.getSegments(ids), x[rows], y[rows], pop.rot[cars]
+                )
+            bestY = np.array([w.getBestCarPos()[1] for w in self.worlds])
+            dead = (
+                collided
+                | (y > bestY[self.trackOf[idx]] + BAD_GENOME_TRESHOLD)
+                | (y > y_old)
+                | (pop.vel[idx] < 0.1)
+                | pop.stagnant(idx, simTime)
+            )
+        else:
+            dead = np.zeros(len(idx), dtype=bool)
+        prof.phase("collision", start)
+
+        pop.kill(idx[dead])
+        survivors = idx[~dead]
+        pop.fitness[survivors] += (
+            -(y[~dead] - y_old[~dead]) / 100
+            + pop.vel[survivors] * SCORE_VEL_MULTIPLIER * self.dt
+        )
+
+        bestPositions = []
+        for k, rows in tracks:
+            world = self.worlds[k]
+            alive = survivors[self.trackOf[survivors] == k]
+            if len(alive) > 0:
+                best = alive[np.argmax(pop.fitness[alive])]
+                if pop.fitness[best] > world.getScore():
+                    world.updateScore(pop.fitness[best])
+                    world.bestGenome = self.genomes[self.genomeOf[best]]
+                    world.bestInputs = pop.inputs[best].copy()
+                    world.bestCommands = pop.commands[best].copy()
+
+            if len(rows) > 0 and y[rows].min() < 0:
+                j = rows[np.argmin(y[rows])]
+                bestPositions.append((x[j], y[j]))
+            else:
+                bestPositions.append((0, 0))
+        return bestPositions
+
+    def genomeFitness(self):
+        fitness = self.pop.fitness.reshape(len(self.roads), self.size)
+        return AGGREGATES[self.aggregate](fitness, axis=0)
+
+    def exhausted(self):
+        return budgetExhausted(
+            self.t, self.startTime, self.genomeFitness().max(), self.config
+        )
+
+    def advance(self, bestPositions):
+        start = self.profiler.clock()
+        for world, road, bestPos in zip(self.worlds, self.roads, bestPositions):
+            world.updateBestCarPos(bestPos)
+            road.update(world)
+        self.profiler.phase("road", start)
+
+    def finish(self):
+        for g, fitness in zip(self.genomes, self.genomeFitness()):
+            g.fitness = float(fitness)
+        self.backend.close()
+
+    def run(self, genomes, config, gen=0):
+        self.reset(genomes, config)
+        self.recorder.start(self)
+
+        while self.pop.count() > 0:
+            self.backend.poll()
+            bestPositions = self.step()
+            if self.pop.count() == 0 or self.exhausted():
+                break
+
+            self.advance(bestPositions)
+            self.recorder.record(self)
+            if self.t % self.render_every != 0:
+                continue
+
+            start = self.profiler.clock()
+            frame = self.backend.render(self.world, self.road, self.view, gen)
+            self.profiler.phase("draw", start)
+            if frame is not None:
+                yield frame
+
+        self.recorder.finish(self, gen)
+        self.finish()
+
+    def evalGenomes(self, genomes, config, gen=0):
+        for _ in self.run(genomes, config, gen):
+            pass
+
+
+def budgetExhausted(t, start_time, best_fitness, config):
+    if MAX_GENERATION_TICKS and t >= MAX_GENERATION_TICKS:
+        return True
+    if (
+        MAX_GENERATION_SECONDS
+        and time.perf_counter() - start_time >= MAX_GENERATION_SECONDS
+    ):
+        return True
+    return (
+        not config.no_fitness_termination and best_fitness >= config.fitness_threshold
+    )
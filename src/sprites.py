@@ -0,0 +1,51 @@
+import os
+import pygame as py
+from config.config_variables import *
+
+images = {}
+atlases = {}
+fonts = {}
+
+
+def getFont(size):
+    if size not in fonts:
+        py.font.init()
+        fonts[size] = py.font.SysFont(FONT_NAME, size)
+    return fonts[size]
+
+
+def loadSprite(name):
+    if name not in images:
+        img = py.image.load(os.path.join("assets", name))
+        if py.display.get_surface() is not None:
+            img = img.convert_alpha()
+        images[name] = py.transform.rotate(
+            py.transform.scale(img, (CAR_LENGTH, CAR_WIDTH)), -90
+        )
+    return images[name]
+
+
+def getAtlas(name):
+    if name not in atlases:
+        atlases[name] = SpriteAtlas(loadSprite(name))
+    return atlases[name]
+
+
+class SpriteAtlas:
+    # one slot per SPRITE_ROTATION_STEP degrees, each rotated lazily on first use
+    def __init__(self, img, step=SPRITE_ROTATION_STEP):
+        self.img = img
+        self.step = step
+        self.count = int(round(360 / step))
+        self.frames = [None] * self.count
+
+    def get(self, rot):
+        k = int(round(rot / self.step)) % self.count
+        if self.frames[k] is None:
+            self.frames[k] = py.transform.rotate(self.img, -k * self.step)
+        return self.frames[k]
+
+
+def blitSprite(win, atlas, rot, screen_position):
+    img = atlas.get(rot)
+    win.blit(img, img.get_rect(center=screen_position).topleft)
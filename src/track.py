@@ -0,0 +1,147 @@
+import os
+import argparse
+import numpy as np
+from random import Random
+from config.config_variables import *
+from .vect2d import vect2d
+
+
+class TrackGenerator:
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else Random()
+
+    def nextCtrlPoint(self, p1, p2):
+        p2.co(p1.x + (self.rng.random() - 0.5) * MAX_DEVIATION, p1.y - SPACING)
+        p2.angle = MAX_ANGLE * (self.rng.random() - 0.5)
+
+    def segment(self, p1, p2):
+        y = p2.y + SPACING / NUM_POINTS * np.arange(NUM_POINTS)
+        x = hermite(p2.y, p2.x, p2.angle, p1.y, p1.x, p1.angle, y)
+        return (x[::-1], y[::-1])
+
+
+class StoredTrack:
+    def __init__(self, path):
+        self.path = path
+        self.center = np.load(os.path.join(path, "center.npy"), mmap_mode="r")
+        self.left = np.load(os.path.join(path, "left.npy"), mmap_mode="r")
+        self.right = np.load(os.path.join(path, "right.npy"), mmap_mode="r")
+        self.ctrl = np.load(os.path.join(path, "ctrl.npy"), mmap_mode="r")
+        self.numSegments = len(self.ctrl) - 2
+
+    def loadSegment(self, k, p2, center, borders):
+        (x, y, angle) = self.ctrl[k + 1]
+        p2.co(float(x), float(y))
+        p2.angle = float(angle)
+
+        rows = slice(k * NUM_POINTS, (k + 1) * NUM_POINTS)
+        center[:] = self.center[rows]
+        borders[0][:] = self.left[rows]
+        borders[1][:] = self.right[rows]
+
+
+class TrackLibrary:
+    def __init__(self, directory):
+        self.directory = directory
+        self.tracks = {}
+
+    def trackPath(self, seed):
+        return os.path.join(self.directory, "track_" + str(seed))
+
+    def seeds(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            int(name[len("track_") :])
+            for name in os.listdir(self.directory)
+            if name.startswith("track_")
+        )
+
+    def build(self, seeds, num_segments):
+        for seed in seeds:
+            saveTrack(self.trackPath(seed), generateTrack(seed, num_segments))
+
+    def get(self, seed):
+        if seed not in self.tracks:
+            self.tracks[seed] = StoredTrack(self.trackPath(seed))
+        return self.tracks[seed]
+
+
+def hermite(y0, x0, m0, y1, x1, m1, y):
+    h = y1 - y0
+    t = (y - y0) / h
+    t2 = t * t
+    t3 = t2 * t
+    return (
+        (2 * t3 - 3 * t2 + 1) * x0
+        + (t3 - 2 * t2 + t) * h * m0
+        + (-2 * t3 + 3 * t2) * x1
+        + (t3 - t2) * h * m1
+    )
+
+
+def offsetBorders(center, prev, prev_left_y, prev_right_y):
+    prev = np.vstack([prev, center[:-1]])
+    angle = np.arctan2(center[:, 0] - prev[:, 0], prev[:, 1] - center[:, 1])
+
+    x = ROAD_WIDTH / 2 * np.cos(angle)
+    y = ROAD_WIDTH / 2 * np.sin(angle)
+    borders = []
+    for sign, prev_y in [(-1, prev_left_y), (1, prev_right_y)]:
+        border = np.empty_like(center)
+        border[:, 0] = center[:, 0] + sign * x
+        border[:, 1] = np.minimum.accumulate(
+            np.concatenate([[prev_y], center[:, 1] + sign * y])
+        )[1:]
+        borders.append(border)
+    return borders
+
+
+def generateTrack(seed, num_segments):
+    generator = TrackGenerator(Random(seed))
+    size = (num_segments + 1) * NUM_POINTS
+
+    ctrl = np.zeros((num_segments + 2, 3))
+    ctrl[0] = (0, SPACING, 0)
+    center = np.empty((size, 2))
+    left = np.empty((size, 2))
+    right = np.empty((size, 2))
+
+    y = SPACING - SPACING / NUM_POINTS * np.arange(NUM_POINTS)
+    center[:NUM_POINTS] = np.column_stack([np.zeros(NUM_POINTS), y])
+    left[:NUM_POINTS] = np.column_stack([np.full(NUM_POINTS, -ROAD_WIDTH / 2), y])
+    right[:NUM_POINTS] = np.column_stack([np.full(NUM_POINTS, ROAD_WIDTH / 2), y])
+
+    p1 = vect2d(0, 0)
+    for k in range(1, num_segments + 1):
+        p2 = vect2d()
+        generator.nextCtrlPoint(p1, p2)
+        ctrl[k + 1] = (p2.x, p2.y, p2.angle)
+
+        rows = slice(k * NUM_POINTS, (k + 1) * NUM_POINTS)
+        center[rows] = np.column_stack(generator.segment(p1, p2))
+        (left[rows], right[rows]) = offsetBorders(
+            center[rows],
+            center[k * NUM_POINTS - 1],
+            left[k * NUM_POINTS - 1, 1],
+            right[k * NUM_POINTS - 1, 1],
+        )
+        p1 = p2
+
+    return {"center": center, "left": left, "right": right, "ctrl": ctrl}
+
+
+def saveTrack(path, track):
+    os.makedirs(path, exist_ok=True)
+    for name, values in track.items():
+        np.save(os.path.join(path, name + ".npy"), values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a library of stored tracks")
+    parser.add_argument("directory")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--segments", type=int, default=5000)
+    args = parser.parse_args()
+
+    TrackLibrary(args.directory).build(args.seeds, args.segments)
@@ -1,4 +1,4 @@
-import pygame as py
+from config.config_variables import *
 
 
 class World:
@@ -6,14 +6,18 @@ class World:
     initialPos = (0, 0)
     bestCarPos = (0, 0)
 
-    def __init__(self, starting_pos, world_width, world_height):
+    def __init__(self, starting_pos, world_width, world_height, win=None):
         self.initialPos = starting_pos
         self.bestCarPos = (0, 0)
-        self.win = py.display.set_mode((world_width, world_height))
+        self.win = win
         self.win_width = world_width
         self.win_height = world_height
         self.score = 0
+        self.config = None
         self.bestGenome = None
+        self.bestNN = None
+        self.bestInputs = [0] * INPUT_NEURONS
+        self.bestCommands = [0] * OUTPUT_NEURONS
 
     def updateBestCarPos(self, pos):
         self.bestCarPos = pos
@@ -24,6 +28,13 @@ class World:
             int(y + self.initialPos[1] - self.bestCarPos[1]),
         )
 
+    def toScreen(self, points):
+        offset = (
+            self.initialPos[0] - self.bestCarPos[0],
+            self.initialPos[1] - self.bestCarPos[1],
+        )
+        return (points + offset).astype(int)
+
     def getBestCarPos(self):
         return self.bestCarPos
 